@@ -0,0 +1,277 @@
+# Benchmark suite for the build and serve paths
+# Times the type chart export, full defensive / offensive scoring of every
+# generation, loading the ranking tables, building each ranking chart from
+# scratch (what a figure cache miss costs), a cold figure cache preload and
+# every Dash callback, then compares them against benchmark_baseline.json so
+# slowdowns show up before they ship. The comparison uses each benchmark's
+# fastest run, which noise from the rest of the machine can only slow down,
+# not speed up. The same code can also run noticeably faster or slower from
+# one interpreter process to the next, so the baseline is the median of
+# several fresh processes, and a benchmark only counts as a regression if it
+# is still slow when re-run in new processes. Timings are machine-specific:
+# record the baseline on the machine that runs the comparison.
+#
+# Usage:
+#   python benchmark.py                    # run everything and compare with the baseline
+#   python benchmark.py -k callback        # only benchmarks whose name contains "callback"
+#   python benchmark.py --save-baseline    # record the current timings as the new baseline
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from datastore import GENERATIONS, DatasetStore, base_path, load_generation_data
+
+sys.path.insert(0, os.path.join(base_path, "build"))
+
+from pkmbuild import TIERS, defensive_scores, load_type_chart, offensive_scores
+from pkmengine import TypeEngine, combo_indices, defensive_multipliers
+
+BASELINE_FILE = os.path.join(base_path, "benchmark_baseline.json")
+# A benchmark regresses when its fastest run is this much slower than the
+# baseline's and at least MIN_REGRESSION_SECONDS slower in absolute terms,
+# so sub-millisecond jitter doesn't fail the run
+TOLERANCE = 0.25
+MIN_REGRESSION_SECONDS = 0.001
+# Fresh processes a benchmark that looks slower is re-run in before it counts
+# as a regression, and fresh processes --save-baseline takes the median of
+CONFIRM_RUNS = 2
+BASELINE_RUNS = 3
+
+
+def bench_export_json():
+    import pkmtypes
+
+    # The JSON is built and serialised in full; only the disk write and the
+    # success message are skipped
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            pkmtypes.export_results_to_json(os.devnull)
+    return run
+
+
+def bench_defensive_scoring(gen):
+    chart = load_type_chart(gen)
+
+    def run():
+        engine = TypeEngine(chart)
+        for arity in TIERS:
+            defensive_scores(defensive_multipliers(engine.matrix, combo_indices(len(engine.type_names), arity)))
+    return run
+
+
+def bench_offensive_scoring(gen):
+    chart = load_type_chart(gen)
+
+    def run():
+        engine = TypeEngine(chart)
+        for arity in TIERS:
+            offensive_scores(engine.matrix, combo_indices(len(engine.type_names), arity))
+    return run
+
+
+def bench_load_generation_data(gen):
+    return lambda: load_generation_data(gen)
+
+
+def bench_build_figure(tier, gen):
+    import figures
+
+    frame = load_generation_data(gen)[figures.TIERS[tier]["frame"]]
+    # Built and serialised the way FigureCache does on a miss
+    def run():
+        figure = figures.build_figure(tier, gen, frame.copy(deep=False), "Normalised Total Score")
+        return json.loads(figure.to_json())
+    return run
+
+
+def bench_figure_preload():
+    import figures
+
+    store = DatasetStore()
+    store.preload()
+    # A new cache every run, so every figure is built; the tables stay loaded
+    return lambda: figures.FigureCache(store).preload(GENERATIONS)
+
+
+def bench_callback(name, *args):
+    # Imported here so build-only runs don't pay for the server's startup
+    import visualise
+
+    callback = getattr(visualise, name)
+    return lambda: callback(*args)
+
+
+TOTAL_DESC = [{"column_id": "Total Score", "direction": "desc"}]
+
+# name -> (setup returning the function to time, default repeats)
+BENCHMARKS = {"pkmtypes.export_results_to_json": (bench_export_json, 5)}
+for _gen in GENERATIONS:
+    BENCHMARKS[f"defensive scoring {_gen}"] = (lambda gen=_gen: bench_defensive_scoring(gen), 20)
+    BENCHMARKS[f"offensive scoring {_gen}"] = (lambda gen=_gen: bench_offensive_scoring(gen), 20)
+    BENCHMARKS[f"load_generation_data {_gen}"] = (lambda gen=_gen: bench_load_generation_data(gen), 5)
+for _tier in ("single", "dual", "triple"):
+    BENCHMARKS[f"build_figure {_tier} GEN9"] = (lambda tier=_tier: bench_build_figure(tier, "GEN9"), 10)
+BENCHMARKS["FigureCache.preload cold"] = (bench_figure_preload, 3)
+BENCHMARKS.update({
+    "callback update_single_type_table": (lambda: bench_callback("update_single_type_table", "GEN9"), 20),
+    "callback update_dual_type_table": (lambda: bench_callback("update_dual_type_table", "GEN9", None, 0, 20, None), 50),
+    "callback update_dual_type_table search+sort": (
+        lambda: bench_callback("update_dual_type_table", "GEN9", "fire", 2, 20, TOTAL_DESC), 50),
+    "callback update_triple_type_table": (lambda: bench_callback("update_triple_type_table", "GEN9", None, 0, 20, None), 50),
+    "callback update_triple_type_table search+sort": (
+        lambda: bench_callback("update_triple_type_table", "GEN9", "dra", 3, 20, TOTAL_DESC), 50),
+    "callback update_single_type_graph": (
+        lambda: bench_callback("update_single_type_graph", "GEN9", "Normalised Total Score"), 50),
+    "callback update_dual_type_graph": (
+        lambda: bench_callback("update_dual_type_graph", "GEN9", "Normalised Total Score"), 50),
+    "callback update_triple_type_graph": (
+        lambda: bench_callback("update_triple_type_graph", "GEN9", "Normalised Total Score", "bar"), 50),
+})
+
+
+def time_function(func, repeats):
+    """Runs func once to warm up, then `repeats` times with the garbage collector off. Returns the timings."""
+    func()
+    timings = []
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return timings
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run(names, repeat_scale=1.0):
+    """Runs the named benchmarks. Returns {name: {"median", "min", "repeats"}} in seconds."""
+    results = {}
+    for name in names:
+        setup, repeats = BENCHMARKS[name]
+        repeats = max(1, round(repeats * repeat_scale))
+        timings = time_function(setup(), repeats)
+        results[name] = {"median": statistics.median(timings), "min": min(timings), "repeats": repeats}
+        print(f"{name:<48} median {results[name]['median'] * 1000:9.3f} ms   min {results[name]['min'] * 1000:9.3f} ms",
+              flush=True)
+    return results
+
+
+def run_in_process(names, repeat_scale=1.0):
+    """run() in a fresh interpreter; its progress lines go to stderr."""
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker",
+                                "--repeat-scale", str(repeat_scale)],
+                               input=json.dumps(names), stdout=subprocess.PIPE, text=True, check=True)
+    return json.loads(completed.stdout)
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Prints each benchmark against the baseline. Returns the names that regressed."""
+    regressions = []
+    print(f"\n{'benchmark (fastest run)':<48} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:<48} {'-':>12} {result['min'] * 1000:9.3f} ms {'new':>8}")
+            continue
+        ratio = result["min"] / previous["min"]
+        regressed = (ratio > 1 + tolerance
+                     and result["min"] - previous["min"] > MIN_REGRESSION_SECONDS)
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<48} {previous['min'] * 1000:9.3f} ms {result['min'] * 1000:9.3f} ms "
+              f"{(ratio - 1) * 100:+7.1f}%{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the build and serve paths and compare with the stored baseline.")
+    parser.add_argument("-k", dest="filter", default="", help="Only run benchmarks whose name contains this text.")
+    parser.add_argument("--repeat-scale", type=float, default=1.0,
+                        help="Multiply every benchmark's number of timed runs (default: 1).")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline file (default: benchmark_baseline.json).")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help=f"Allowed slowdown before a benchmark counts as a regression (default: {TOLERANCE}).")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"Write the median of {BASELINE_RUNS} runs, each in a fresh process, as the new baseline.")
+    # Used by run_in_process(): benchmark names as JSON on stdin, results as JSON on stdout
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        with contextlib.redirect_stdout(sys.stderr):
+            results = run(json.load(sys.stdin), args.repeat_scale)
+        print(json.dumps(results))
+        return 0
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    if not names:
+        parser.error(f"No benchmark names contain '{args.filter}'. Available: {list(BENCHMARKS)}")
+    results = run(names, args.repeat_scale)
+
+    if args.save_baseline:
+        runs = [results] + [run_in_process(names, args.repeat_scale) for _ in range(BASELINE_RUNS - 1)]
+        results = {name: {"median": statistics.median(r[name]["median"] for r in runs),
+                          "min": statistics.median(r[name]["min"] for r in runs),
+                          "repeats": results[name]["repeats"]} for name in names}
+        baseline = {"environment": environment(), "results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline["results"] = json.load(f)["results"]
+        baseline["results"].update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {os.path.relpath(args.baseline)}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {os.path.relpath(args.baseline)}; run with --save-baseline to record one.")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["environment"] != environment():
+        print(f"Note: baseline was recorded on {baseline['environment']}, this run is {environment()}.")
+    regressions = compare(results, baseline, args.tolerance)
+    for _ in range(CONFIRM_RUNS):
+        if not regressions:
+            break
+        # Keep the fastest run seen in any process
+        print(f"\nRe-running {len(regressions)} slower benchmark(s) in a fresh process to rule out noise")
+        for name, result in run_in_process(regressions, args.repeat_scale).items():
+            results[name]["min"] = min(results[name]["min"], result["min"])
+        regressions = compare({name: results[name] for name in regressions}, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,76 +1,53 @@
 import os
-import json
+import sys
 import csv
 import itertools
 
-def debug(msg):
-    print("[DEBUG]", msg)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pkmscore import ScoreArtifact
+from pkmtrace import DEBUG, get_tracer
+
+trace = get_tracer("off2")
 
 def load_data(filename):
     """
-    Loads the JSON from a file which has:
-      'type_ids': { 'Normal':0, 'Fire':1, ... },
-      'results': [ {...}, {...} ]
+    Memory-maps the packed score artifact (see pkmscore.py), which exposes:
+      'type_ids': { 'Normal':0, 'Fire':1, ... }
+      lookup(type_ids) -> (defensive, offensive) multiplier rows
     """
-    with open(filename, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return ScoreArtifact(filename)
 
-def find_single_type_entry(results_list, type_id):
+def find_single_type_entry(data, type_id):
     """
-    Given results_list (the array from data['results']) and a single type_id,
-    returns the object where entry['types'] == [type_id].
+    Given the loaded artifact and a single type_id, returns the entry as
+    {'defensive': {attacker: multiplier}, 'offensive': {defender: multiplier}}.
+    The row is read straight from the memory-mapped file by its combo
+    index instead of scanning every result.
     If not found, returns None.
     """
-    for entry in results_list:
-        # For a single-type entry, 'entry["types"]' might be [7] for Poison
-        if entry.get('types') == [type_id]:
-            return entry
-    return None
+    if not 0 <= type_id < len(data.type_names):
+        return None
+    defensive, offensive = data.lookup([type_id])
+    return {
+        'defensive': dict(zip(data.type_names, defensive.tolist())),
+        'offensive': dict(zip(data.type_names, offensive.tolist())),
+    }
 
 def build_score_map(entry):
     """
     From one single-type entry, build a map: target_type -> score
-    using keys: 'c' (coverage), 'or' (offensive resistances),
-    'oi' (offensive immunities), 'n' (normal effectiveness).
+    covering its coverage (super effective), offensive resistances,
+    offensive immunities and neutral matchups.
 
-    For example, if entry["c"] = [{"type":"Grass","score":2.0}], that means
-    score_map["Grass"] = 2.0.
+    For example, Fire's entry maps "Grass" to 2.0 and "Water" to 0.5.
 
-    If none of these arrays mention a certain target type, default to 1.0 later.
+    Target types not in the map default to 1.0 later.
     """
-    debug("    Building score map for a single-type entry")
-    score_map = {}
-
-    # Coverage
-    coverage_list = entry.get('c', [])
-    for matchup in coverage_list:
-        tgt = matchup['type']
-        val = matchup['score']
-        score_map[tgt] = val
-
-    # Offensive Resistances
-    off_res_list = entry.get('or', [])
-    for matchup in off_res_list:
-        tgt = matchup['type']
-        val = matchup['score']
-        score_map[tgt] = val
-
-    # Offensive Immunities
-    off_imm_list = entry.get('oi', [])
-    for matchup in off_imm_list:
-        tgt = matchup['type']
-        val = matchup['score']
-        score_map[tgt] = val
-
-    # Normal effectiveness
-    normal_list = entry.get('n', [])
-    for matchup in normal_list:
-        tgt = matchup['type']
-        val = matchup['score']
-        if tgt not in score_map:
-            score_map[tgt] = val
-
-    debug(f"    Single-type score map = {score_map}")
+    trace.debug("    Building score map for a single-type entry")
+    score_map = dict(entry['offensive'])
+
+    trace.debug("    Single-type score map = %s", score_map)
     return score_map
 
 def calculate_offensive_score(requested_type, data):
@@ -78,59 +55,57 @@ def calculate_offensive_score(requested_type, data):
     Steps:
 
     0. If requested_type is single, treat it as dual (Poison -> Poison/Poison)
-    1. Convert each type name to an ID via data['type_ids']
-    2. Find single-type entries in data['results'] for those IDs
+    1. Convert each type name to an ID via data.type_ids
+    2. Look up single-type entries in the artifact for those IDs
     3. Build a score map for each single-type
-    4. Gather all possible target types from data['type_ids'].keys()
+    4. Gather all possible target types from data.type_ids.keys()
     5. Compare/merge the two maps
     6. Convert each final multiplier to points
     9. Sum them up
     """
-    debug("Step 0: Checking requested type input")
+    # Checked once so the per-target loops below skip tracing entirely when it is off
+    tracing = trace.isEnabledFor(DEBUG)
+
+    trace.debug("Step 0: Checking requested type input")
     if '/' in requested_type:
         type_names = requested_type.split('/')
     else:
         type_names = [requested_type, requested_type]
-    debug(f"    Dual types determined: {type_names}")
-
-    # data should have 'type_ids' and 'results'
-    if 'type_ids' not in data or 'results' not in data:
-        raise KeyError("JSON data missing 'type_ids' or 'results' at top level.")
+    trace.debug("    Dual types determined: %s", type_names)
 
-    type_ids_map = data['type_ids']   # e.g. {'Poison':7, 'Water':2, ...}
-    results_list = data['results']    # e.g. array of single-type objects
+    type_ids_map = data.type_ids   # e.g. {'Poison':7, 'Water':2, ...}
 
-    debug("Step 1: Converting type names to IDs")
+    trace.debug("Step 1: Converting type names to IDs")
     dual_type_ids = []
     for name in type_names:
         if name not in type_ids_map:
             raise KeyError(f"Type '{name}' not found in type_ids. Available: {list(type_ids_map.keys())}")
         tid = type_ids_map[name]
         dual_type_ids.append(tid)
-        debug(f"    '{name}' -> {tid}")
+        trace.debug("    '%s' -> %s", name, tid)
 
-    debug("Step 2: Finding single-type entries in results for each ID")
+    trace.debug("Step 2: Looking up single-type entries in the artifact for each ID")
     single_entries = []
     for tid in dual_type_ids:
-        entry = find_single_type_entry(results_list, tid)
+        entry = find_single_type_entry(data, tid)
         if entry is None:
             raise ValueError(f"No single-type data found for type_id={tid} in results.")
         single_entries.append(entry)
-        debug(f"    Found entry for type_id={tid} -> (has keys: {list(entry.keys())})")
+        trace.debug("    Found entry for type_id=%s -> (has keys: %s)", tid, list(entry.keys()))
 
-    debug("Step 3: Building score maps for each single-type entry")
+    trace.debug("Step 3: Building score maps for each single-type entry")
     score_maps = []
     for e in single_entries:
         smap = build_score_map(e)
         score_maps.append(smap)
-    debug(f"    Score maps built. Count={len(score_maps)}\n")
+    trace.debug("    Score maps built. Count=%s\n", len(score_maps))
 
-    debug("Step 4: Identify all target types from type_ids keys")
+    trace.debug("Step 4: Identify all target types from type_ids keys")
     # We'll evaluate this dual type vs. all known type names
     all_target_types = list(type_ids_map.keys())
-    debug(f"    Found {len(all_target_types)} possible target types: {all_target_types}\n")
+    trace.debug("    Found %s possible target types: %s\n", len(all_target_types), all_target_types)
 
-    debug("Step 5: Comparing each chosen type's score for every target type")
+    trace.debug("Step 5: Comparing each chosen type's score for every target type")
     combined_score_map = {}
 
     def get_score(m, t):
@@ -148,14 +123,15 @@ def calculate_offensive_score(requested_type, data):
         else:
             chosen = s1  # same
         combined_score_map[tgt] = chosen
-        debug(f"    Target='{tgt}', Score1={s1}, Score2={s2}, Combined={chosen}")
+        if tracing:
+            trace.debug("    Target='%s', Score1=%s, Score2=%s, Combined=%s", tgt, s1, s2, chosen)
 
-    debug("Step 6: Finished merging.\n")
+    trace.debug("Step 6: Finished merging.\n")
 
-    debug("Step 7: Verifying combined map size & content")
-    debug(f"    combined_score_map size={len(combined_score_map)} => {combined_score_map}\n")
+    trace.debug("Step 7: Verifying combined map size & content")
+    trace.debug("    combined_score_map size=%s => %s\n", len(combined_score_map), combined_score_map)
 
-    debug("Step 8: Converting each final multiplier to point total")
+    trace.debug("Step 8: Converting each final multiplier to point total")
     scoring_map = {
         2.0:  2.0,
         1.0:  0.0,
@@ -163,14 +139,15 @@ def calculate_offensive_score(requested_type, data):
         0.0: -3.5
     }
 
-    debug("Step 9: Summing final offensive score")
+    trace.debug("Step 9: Summing final offensive score")
     total_score = 0.0
     for tgt_type, multiplier in combined_score_map.items():
         points = scoring_map.get(multiplier, 0.0)
         total_score += points
-        debug(f"    {tgt_type}: multiplier={multiplier}, points={points}")
+        if tracing:
+            trace.debug("    %s: multiplier=%s, points=%s", tgt_type, multiplier, points)
 
-    debug(f"Final Offensive Score for {requested_type}: {total_score}\n")
+    trace.debug("Final Offensive Score for %s: %s\n", requested_type, total_score)
     return total_score
 
 def export_combinations_to_csv(combinations, filename, fieldnames):
@@ -190,7 +167,7 @@ def export_combinations_to_csv(combinations, filename, fieldnames):
 
 def handle_csv_export(data):
     try:
-        type_ids = list(data['type_ids'].keys())
+        type_ids = list(data.type_ids.keys())
         monotype_combinations = [(types, calculate_offensive_score('/'.join(types), data)) for types in itertools.combinations(type_ids, 1)]
         dualtype_combinations = [(types, calculate_offensive_score('/'.join(types), data)) for types in itertools.combinations(type_ids, 2)]
         tripletype_combinations = [(types, calculate_offensive_score('/'.join(types), data)) for types in itertools.combinations(type_ids, 3)]
@@ -222,6 +199,6 @@ def interactive_prompt(data):
 
 if __name__ == "__main__":
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    pkm_score_path = os.path.join(script_dir, "pkm-score.json")
+    pkm_score_path = os.path.join(script_dir, "pkm-score.bin")
     data = load_data(pkm_score_path)
     interactive_prompt(data)
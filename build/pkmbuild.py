@@ -0,0 +1,209 @@
+# Master build for the ranking CSVs
+# Scores every mono, dual and tri type combination of each requested
+# generation in one vectorised pass and writes the final
+# {mono,dual,triple}type_combinations{GEN}.csv files the visualiser reads,
+# replacing the pkm-def / pkm-off2 / pkm-defupd8 / totalupd8 chain.
+#
+# Usage: python build/pkmbuild.py [GEN9 GEN1 GEN5] [--jobs N] [--artifacts] [--timings]
+import argparse
+import csv
+import importlib.util
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+
+from pkmengine import TypeEngine, defensive_multipliers
+from pkmh2h import write_matchups
+from pkmscore import write_artifact
+from pkmtrace import StageTimer, configure, current_level
+
+repo_dir = os.path.dirname(script_dir)
+
+# Generation -> (type chart module, suffix used by the CSVs and artifacts)
+GENERATIONS = {
+    "GEN9": (os.path.join(script_dir, "pkmtypes.py"), ""),
+    "GEN1": (os.path.join(script_dir, "GEN I", "pkmtypesGENI.py"), "GEN1"),
+    "GEN5": (os.path.join(script_dir, "GEN V", "pkmtypesGENV.py"), "GEN5"),
+}
+
+TIERS = {1: "monotype", 2: "dualtype", 3: "tripletype"}
+TYPE_COLUMNS = ["First Type", "Second Type", "Third Type"]
+SCORE_COLUMNS = ["Defensive Score", "Offensive Score", "Total Score"]
+# The published CSVs use Windows line endings
+LINE_TERMINATOR = '\r\n'
+
+# Final multiplier -> points, as in calculate_defensive_score / calculate_offensive_score.
+# Multipliers missing from a map (e.g. a x8 triple weakness) score 0.
+DEFENSIVE_POINTS = {
+    6.0: -7.0,
+    4.0: -5.0,
+    2.0: -2.0,
+    1.0: 0.0,
+    0.5: 2.0,
+    0.25: 3.5,
+    0.125: 3.75,
+    0.0: 4.0
+}
+OFFENSIVE_POINTS = {
+    2.0:  2.0,
+    1.0:  0.0,
+    0.5: -2.0,
+    0.0: -3.5
+}
+
+
+def generation_suffix(gen):
+    """Suffix of a generation's CSV and artifact file names ('' for GEN9, e.g. 'GEN1' otherwise)."""
+    if gen not in GENERATIONS:
+        raise KeyError(f"Unknown generation '{gen}'. Available: {list(GENERATIONS)}")
+    return GENERATIONS[gen][1]
+
+
+def artifact_path(gen):
+    """The generation's packed score artifact, pkm-score{GEN}.bin in build/."""
+    return os.path.join(script_dir, f"pkm-score{generation_suffix(gen)}.bin")
+
+
+def matchup_path(gen):
+    """The generation's head-to-head matrix, pkm-h2h{GEN}.bin in build/."""
+    return os.path.join(script_dir, f"pkm-h2h{generation_suffix(gen)}.bin")
+
+
+def load_type_chart(gen):
+    chart_path, _ = GENERATIONS[gen]
+    spec = importlib.util.spec_from_file_location(f"pkmtypes{gen}", chart_path)
+    if not (spec and spec.loader):
+        raise FileNotFoundError(f"Type chart for {gen} not found at {chart_path}.")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.type_chart
+
+
+def points_for(multipliers, points_map):
+    """Maps every multiplier in an array to its points (0 for unlisted multipliers)."""
+    points = np.zeros(multipliers.shape, dtype=np.float64)
+    for multiplier, value in points_map.items():
+        points[multipliers == multiplier] = value
+    return points
+
+
+def defensive_scores(multipliers):
+    """
+    Sum of defensive points over every attacking type, given the
+    (n_combos, n_types) defensive multipliers from the engine.
+    """
+    return points_for(multipliers, DEFENSIVE_POINTS).sum(axis=1)
+
+
+def offensive_scores(matrix, combos):
+    """
+    Sum of offensive points over every defending type, taking the better of
+    the combo's attacking types against each one. Only the first two types
+    count (a monotype counts twice), matching the published rankings.
+    """
+    attackers = combos[:, :2] if combos.shape[1] > 1 else combos
+    return points_for(matrix[attackers].max(axis=1), OFFENSIVE_POINTS).sum(axis=1)
+
+
+def score_combos(engine, combos):
+    """Returns (defensive, offensive, total) scores for an (n_combos, arity) array of type ids."""
+    defensive = defensive_scores(defensive_multipliers(engine.matrix, combos))
+    offensive = offensive_scores(engine.matrix, combos)
+    return defensive, offensive, offensive + defensive
+
+
+def score_tier(engine, arity):
+    """Returns (combos, defensive, offensive, total) for every combo of one arity."""
+    table = engine.table(arity)
+    defensive = defensive_scores(table["defensive"])
+    offensive = offensive_scores(engine.matrix, table["combos"])
+    return table["combos"], defensive, offensive, offensive + defensive
+
+
+def tier_path(output_dir, arity, suffix):
+    return os.path.join(output_dir, f"{TIERS[arity]}_combinations{suffix}.csv")
+
+
+def tier_rows(type_names, combos, defensive, offensive, total):
+    """CSV rows (type names then scores) for a batch of scored combos."""
+    for combo, scores in zip(combos.tolist(), zip(defensive.tolist(), offensive.tolist(), total.tolist())):
+        yield [type_names[t] for t in combo] + [repr(score) for score in scores]
+
+
+def write_tier_csv(filename, type_names, combos, defensive, offensive, total):
+    fieldnames = TYPE_COLUMNS[:combos.shape[1]] + SCORE_COLUMNS
+    with open(filename, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file, lineterminator=LINE_TERMINATOR)
+        writer.writerow(fieldnames)
+        writer.writerows(tier_rows(type_names, combos, defensive, offensive, total))
+
+
+def build_generation(gen, output_dir=repo_dir, artifacts=False, timer=None):
+    """
+    Scores and writes all three tiers for one generation. Returns the files
+    written. Stage times (chart load, scoring, CSV write, artifacts) go to
+    `timer`, or to a StageTimer of its own, and are traced at INFO.
+    """
+    suffix = generation_suffix(gen)
+    timer = timer or StageTimer(gen)
+    with timer.stage("chart load"):
+        engine = TypeEngine(load_type_chart(gen))
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for arity in TIERS:
+        path = tier_path(output_dir, arity, suffix)
+        with timer.stage("scoring"):
+            scored = score_tier(engine, arity)
+        with timer.stage("CSV write"):
+            write_tier_csv(path, engine.type_names, *scored)
+        written.append(path)
+    if artifacts:
+        with timer.stage("artifacts"):
+            path = artifact_path(gen)
+            write_artifact(path, engine, gen)
+            written.append(path)
+            path = matchup_path(gen)
+            write_matchups(path, engine, gen)
+            written.append(path)
+    timer.report()
+    return written
+
+
+def build(generations, output_dir=repo_dir, artifacts=False, jobs=None):
+    """Builds each generation in its own process. Returns {gen: [files written]}."""
+    for gen in generations:
+        if gen not in GENERATIONS:
+            raise KeyError(f"Unknown generation '{gen}'. Available: {list(GENERATIONS)}")
+    if len(generations) == 1 or jobs == 1:
+        return {gen: build_generation(gen, output_dir, artifacts) for gen in generations}
+    # Workers trace at the same level as this process
+    with ProcessPoolExecutor(max_workers=jobs, initializer=configure, initargs=(current_level(),)) as pool:
+        futures = {gen: pool.submit(build_generation, gen, output_dir, artifacts) for gen in generations}
+        return {gen: future.result() for gen, future in futures.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the ranking CSVs for one or more generations.")
+    parser.add_argument("generations", nargs="*", default=list(GENERATIONS),
+                        help=f"Generations to build (default: all of {', '.join(GENERATIONS)}).")
+    parser.add_argument("--output-dir", default=repo_dir, help="Where to write the CSVs (default: repository root).")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: one per CPU).")
+    parser.add_argument("--artifacts", action="store_true",
+                        help="Also write the pkm-score{GEN}.bin and pkm-h2h{GEN}.bin artifacts into build/.")
+    parser.add_argument("--timings", action="store_true", help="Print how long each build stage takes (same as PKM_TRACE=info).")
+    args = parser.parse_args(argv)
+    if args.timings:
+        configure("info")
+
+    for gen, files in build(args.generations, args.output_dir, args.artifacts, args.jobs).items():
+        for path in files:
+            print(f"{gen}: wrote {os.path.relpath(path)}")
+
+
+if __name__ == "__main__":
+    main()
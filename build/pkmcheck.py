@@ -0,0 +1,187 @@
+# Invariant checks for the build outputs
+# Rebuilds everything into a temporary directory and checks that:
+#   - pkmbuild.build() reproduces the committed CSVs, pkm-score and pkm-h2h
+#     files byte for byte
+#   - pkmdelta.apply_cell() on copies of them gives exactly what a full
+#     rebuild from the edited chart gives, and a multiplier the artifacts
+#     can't hold is refused without touching them
+#   - sampled head-to-head multipliers match a brute-force walk of the chart
+#   - pkmteam.best_team() finds the best score of an exhaustive enumeration
+#     on pools small enough to enumerate
+# Exits with status 1 if any check fails.
+#
+# Usage: python build/pkmcheck.py [--samples 3000] [--seed 0]
+import argparse
+import copy
+import filecmp
+import itertools
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+
+from pkmbuild import (GENERATIONS, TIERS, artifact_path, build, generation_suffix, load_type_chart, matchup_path,
+                      repo_dir, score_tier, tier_path, write_tier_csv)
+from pkmdelta import apply_cell
+from pkmengine import TypeEngine
+from pkmh2h import MatchupMatrix, write_matchups
+from pkmscore import ScoreArtifact, write_artifact
+from pkmteam import TeamPool, best_team
+
+# Chart edits applied by the delta checks: one the artifacts can hold, one
+# they can't
+DELTA_CELL = ("GEN9", "Fire", "Grass", 1.5)
+INEXACT_CELL = ("GEN9", "Fire", "Grass", 1.2)
+# (generation, team size, arities) small enough to enumerate every team
+TEAM_CASES = [("GEN1", 3, (1,)), ("GEN9", 3, (1,)), ("GEN1", 2, (1, 2))]
+
+
+def output_files(gen, directory):
+    """(CSV, pkm-score, pkm-h2h) paths of a generation's outputs, all in `directory`."""
+    suffix = generation_suffix(gen)
+    csvs = [tier_path(directory, arity, suffix) for arity in TIERS]
+    return csvs + [os.path.join(directory, os.path.basename(artifact_path(gen))),
+                   os.path.join(directory, os.path.basename(matchup_path(gen)))]
+
+
+def committed_files(gen):
+    suffix = generation_suffix(gen)
+    return [tier_path(repo_dir, arity, suffix) for arity in TIERS] + [artifact_path(gen), matchup_path(gen)]
+
+
+def write_outputs(gen, chart, directory):
+    """Writes every output of a generation from `chart` into `directory`."""
+    engine = TypeEngine(chart)
+    csvs = output_files(gen, directory)
+    for path, arity in zip(csvs, TIERS):
+        write_tier_csv(path, engine.type_names, *score_tier(engine, arity))
+    write_artifact(csvs[-2], engine, gen)
+    write_matchups(csvs[-1], engine, gen)
+
+
+def differing(expected, actual):
+    return [os.path.basename(path) for path, other in zip(expected, actual)
+            if not filecmp.cmp(path, other, shallow=False)]
+
+
+def read_all(paths):
+    contents = []
+    for path in paths:
+        with open(path, "rb") as f:
+            contents.append(f.read())
+    return contents
+
+
+def check_build(workdir, jobs=None):
+    """pkmbuild.build() and the artifact writers reproduce the committed files."""
+    build(list(GENERATIONS), output_dir=workdir, jobs=jobs)
+    problems = []
+    for gen in GENERATIONS:
+        engine = TypeEngine(load_type_chart(gen))
+        built = output_files(gen, workdir)
+        write_artifact(built[-2], engine, gen)
+        write_matchups(built[-1], engine, gen)
+        problems += [f"{gen}: {name} differs from the committed file"
+                     for name in differing(committed_files(gen), built)]
+    return problems
+
+
+def check_delta(workdir):
+    """apply_cell() on copies of the committed files matches a full rebuild from the edited chart."""
+    gen, attacker, defender, multiplier = DELTA_CELL
+    patched_dir = os.path.join(workdir, "patched")
+    rebuilt_dir = os.path.join(workdir, "rebuilt")
+    os.makedirs(patched_dir)
+    os.makedirs(rebuilt_dir)
+    patched = output_files(gen, patched_dir)
+    for source, target in zip(committed_files(gen), patched):
+        shutil.copyfile(source, target)
+    apply_cell(gen, attacker, defender, multiplier, output_dir=patched_dir, artifact=patched[-2], matchups=patched[-1])
+
+    chart = copy.deepcopy(load_type_chart(gen))
+    chart[attacker][defender] = multiplier
+    write_outputs(gen, chart, rebuilt_dir)
+    problems = [f"{gen} {attacker}->{defender} x{multiplier:g}: patched {name} differs from a full rebuild"
+                for name in differing(output_files(gen, rebuilt_dir), patched)]
+
+    gen, attacker, defender, multiplier = INEXACT_CELL
+    patched = output_files(gen, patched_dir)
+    before = read_all(patched)
+    try:
+        apply_cell(gen, attacker, defender, multiplier, output_dir=patched_dir, artifact=patched[-2],
+                   matchups=patched[-1])
+        problems.append(f"{gen} {attacker}->{defender} x{multiplier:g} was accepted; it can't be stored exactly")
+    except ValueError:
+        pass
+    problems += [f"{gen}: refused x{multiplier:g} edit still changed {os.path.basename(path)}"
+                 for path, old, new in zip(patched, before, read_all(patched)) if old != new]
+    return problems
+
+
+def check_matchups(samples, seed):
+    """Sampled pkm-h2h multipliers match the best STAB multiplier worked out from the chart."""
+    rng = random.Random(seed)
+    problems = []
+    for gen in GENERATIONS:
+        chart = load_type_chart(gen)
+        matchups = MatchupMatrix(matchup_path(gen))
+        for _ in range(samples):
+            a, b = rng.randrange(matchups.total), rng.randrange(matchups.total)
+            attacker, defender = matchups.names(a), matchups.names(b)
+            expected = 0.0
+            for attacking_type in attacker:
+                multiplier = 1.0
+                for defending_type in defender:
+                    multiplier *= chart[attacking_type].get(defending_type, 1.0)
+                expected = max(expected, multiplier)
+            actual = float(matchups.multipliers[a, b])
+            if actual != expected:
+                problems.append(f"{gen}: {'/'.join(attacker)} vs {'/'.join(defender)} is x{actual:g}, "
+                                f"the chart gives x{expected:g}")
+    return problems
+
+
+def check_teams():
+    """best_team() matches the best score of every team enumerated on small pools."""
+    problems = []
+    for gen, k, arities in TEAM_CASES:
+        pool = TeamPool(ScoreArtifact(artifact_path(gen)), arities)
+        best = max(pool.describe(list(members))["score"] for members in itertools.combinations(range(len(pool)), k))
+        result = best_team(gen, k, jobs=1, arities=arities)
+        if not result["optimal"] or result["score"] != best:
+            problems.append(f"{gen} k={k} arities={arities}: search found {result['score']:g} "
+                            f"(optimal={result['optimal']}), enumeration {best:g}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the build outputs against full rebuilds and brute force.")
+    parser.add_argument("--samples", type=int, default=3000,
+                        help="Head-to-head pairs to check per generation (default: 3000).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the sampled pairs (default: 0).")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes for the build (default: one per CPU).")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    with tempfile.TemporaryDirectory() as workdir:
+        checks = [
+            ("full build", lambda: check_build(os.path.join(workdir, "build"), args.jobs)),
+            ("chart delta", lambda: check_delta(os.path.join(workdir, "delta"))),
+            ("head-to-head", lambda: check_matchups(args.samples, args.seed)),
+            ("team search", check_teams),
+        ]
+        for name, check in checks:
+            problems = check()
+            print(f"{name}: {'FAILED' if problems else 'ok'}")
+            for problem in problems:
+                print(f"  {problem}")
+            failed += bool(problems)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+# Incremental rebuild for type chart edits
+# A changed chart cell (attacker, defender) can only move the scores of combos
+# that contain the defender (defence) or lead with the attacker (offence), so
+# only those rows are recomputed and patched into the existing ranking CSVs
+# and pkm-score artifact instead of rebuilding every generation from scratch.
+#
+# Usage:
+#   python build/pkmdelta.py GEN9                        # sync outputs with an edited chart file
+#   python build/pkmdelta.py GEN9 --set Fire Grass 1.0   # try a cell change without editing the chart
+import argparse
+import copy
+import csv
+import io
+import os
+import shutil
+import sys
+
+import numpy as np
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+
+from pkmbuild import (GENERATIONS, LINE_TERMINATOR, TIERS, artifact_path, generation_suffix, load_type_chart,
+                      matchup_path, repo_dir, score_combos, tier_path, tier_rows)
+from pkmengine import TypeEngine, combo_indices, defensive_multipliers, offensive_multipliers
+from pkmh2h import write_matchups
+from pkmscore import DEFENSIVE, OFFENSIVE, ScoreArtifact, to_float16
+
+
+def changed_cells(old_matrix, new_matrix):
+    """(attacker_id, defender_id) pairs whose multiplier differs between two charts."""
+    if old_matrix.shape != new_matrix.shape:
+        raise ValueError("The type list changed; run a full pkmbuild.py rebuild instead.")
+    return np.argwhere(old_matrix != new_matrix)
+
+
+def affected_rows(combos, cells):
+    """
+    Returns boolean masks over `combos` for the rows a set of changed cells
+    can touch:
+      defensive - multiplier rows / scores that involve a changed defender
+      offensive - offensive multiplier rows that involve a changed attacker
+      scores    - CSV rows whose defensive or offensive score can change
+                  (offence only counts the first two types, see pkmbuild)
+    """
+    attackers = np.unique(cells[:, 0])
+    defenders = np.unique(cells[:, 1])
+    defensive = np.isin(combos, defenders).any(axis=1)
+    offensive = np.isin(combos, attackers).any(axis=1)
+    scores = defensive | np.isin(combos[:, :2], attackers).any(axis=1)
+    return defensive, offensive, scores
+
+
+def patch_tier_csv(filename, type_names, combos, rows, defensive, offensive, total):
+    """Rewrites only the given data rows of a ranking CSV, leaving every other byte as it was."""
+    with open(filename, newline='', encoding='utf-8') as file:
+        lines = file.readlines()
+    if len(lines) != len(combos) + 1:
+        raise ValueError(f"{filename} doesn't match the chart's combos; run a full pkmbuild.py rebuild instead.")
+
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator=LINE_TERMINATOR).writerows(
+        tier_rows(type_names, combos[rows], defensive, offensive, total))
+    for row, line in zip(rows.tolist(), buffer.getvalue().splitlines(keepends=True)):
+        lines[row + 1] = line
+
+    temp_path = f"{filename}.tmp"
+    with open(temp_path, mode='w', newline='', encoding='utf-8') as file:
+        file.writelines(lines)
+    os.replace(temp_path, filename)
+
+
+def apply_delta(gen, new_chart, old_matrix=None, output_dir=repo_dir, artifact=None, matchups=None):
+    """
+    Brings the ranking CSVs and score artifact of `gen` in line with
+    `new_chart`, recomputing only the combos the changed cells affect.
+
+    old_matrix defaults to the chart stored in the generation's artifact,
+    i.e. whatever the outputs were last built from. Ranks aren't stored in
+    the CSVs; visualise.py derives them from Total Score when it loads them.
+    A changed cell can move any head-to-head matchup, so the generation's
+    pkm-h2h{GEN}.bin (or `matchups`), if present, is rebuilt whole; that
+    takes a fraction of a second. Every file is patched or written as a
+    copy and swapped in, so a server reading them never sees half-patched
+    rows.
+
+    Raises ValueError, before changing anything, if a new multiplier can't
+    be stored exactly in the artifact (see pkmscore.to_float16).
+
+    Returns {arity: number of CSV rows patched}.
+    """
+    engine = TypeEngine(new_chart)
+    if artifact is None:
+        artifact = artifact_path(gen)
+    if not os.path.exists(artifact):
+        raise FileNotFoundError(f"{artifact} not found; run pkmbuild.py --artifacts first.")
+    scores_artifact = ScoreArtifact(artifact)
+    if scores_artifact.type_names != engine.type_names:
+        raise ValueError("The type list changed; run a full pkmbuild.py rebuild instead.")
+    if old_matrix is None:
+        old_matrix = scores_artifact.chart_matrix()
+
+    cells = changed_cells(old_matrix, engine.matrix)
+    suffix = generation_suffix(gen)
+    # Everything is worked out before anything is written, so a multiplier
+    # the artifact can't hold leaves the CSVs and artifact untouched
+    patches = {}
+    for arity in TIERS:
+        if len(cells) == 0:
+            continue
+        combos = combo_indices(len(engine.type_names), arity)
+        defensive_rows, offensive_rows, score_rows = affected_rows(combos, cells)
+        rows = np.flatnonzero(score_rows)
+        patch = {"rows": rows, "scores": score_combos(engine, combos[rows])}
+        if arity in scores_artifact.arities:
+            changed = combos[defensive_rows]
+            patch["defensive"] = (scores_artifact.indices(changed),
+                                  to_float16(defensive_multipliers(engine.matrix, changed)))
+            changed = combos[offensive_rows]
+            patch["offensive"] = (scores_artifact.indices(changed),
+                                  to_float16(offensive_multipliers(engine.matrix, changed)))
+        patches[arity] = (combos, patch)
+
+    patched = {}
+    for arity in TIERS:
+        if arity not in patches:
+            patched[arity] = 0
+            continue
+        combos, patch = patches[arity]
+        patch_tier_csv(tier_path(output_dir, arity, suffix), engine.type_names, combos, patch["rows"],
+                       *patch["scores"])
+        patched[arity] = len(patch["rows"])
+    if any("defensive" in patch for _, patch in patches.values()):
+        temp_path = f"{artifact}.tmp"
+        shutil.copyfile(artifact, temp_path)
+        staged = ScoreArtifact(temp_path, mode="r+")
+        for _, patch in patches.values():
+            if "defensive" in patch:
+                staged.blocks[patch["defensive"][0], DEFENSIVE] = patch["defensive"][1]
+                staged.blocks[patch["offensive"][0], OFFENSIVE] = patch["offensive"][1]
+        staged.blocks.flush()
+        del staged  # release the mapping before the swap
+        os.replace(temp_path, artifact)
+    if matchups is None:
+        matchups = matchup_path(gen)
+    if len(cells) and os.path.exists(matchups):
+        write_matchups(matchups, engine, gen, scores_artifact.arities)
+    return patched
+
+
+def apply_cell(gen, attacker, defender, multiplier, base_chart=None, **kwargs):
+    """
+    apply_delta() for a single chart cell on top of `base_chart` (the
+    generation's chart file by default), e.g. ("Fire", "Grass", 1.0).
+    """
+    new_chart = copy.deepcopy(base_chart if base_chart is not None else load_type_chart(gen))
+    for name in (attacker, defender):
+        if name not in new_chart:
+            raise KeyError(f"Type '{name}' not found in type chart. Available: {list(new_chart)}")
+    new_chart[attacker][defender] = float(multiplier)
+    return apply_delta(gen, new_chart, **kwargs)
+
+
+class ChartCellAction(argparse.Action):
+    """Collects --set ATTACKER DEFENDER MULTIPLIER triples, parsing the multiplier as a float."""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        attacker, defender, multiplier = values
+        try:
+            multiplier = float(multiplier)
+        except ValueError:
+            raise argparse.ArgumentError(self, f"invalid multiplier '{multiplier}' for {attacker} -> {defender}")
+        setattr(namespace, self.dest, getattr(namespace, self.dest) + [(attacker, defender, multiplier)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Patch a generation's ranking CSVs and artifact after a type chart edit.")
+    parser.add_argument("generation", choices=list(GENERATIONS))
+    parser.add_argument("--set", nargs=3, action=ChartCellAction, default=[],
+                        metavar=("ATTACKER", "DEFENDER", "MULTIPLIER"),
+                        help="Override a chart cell instead of editing the chart file (repeatable).")
+    parser.add_argument("--output-dir", default=repo_dir, help="Where the CSVs live (default: repository root).")
+    args = parser.parse_args(argv)
+
+    new_chart = copy.deepcopy(load_type_chart(args.generation))
+    for attacker, defender, multiplier in args.set:
+        if attacker not in new_chart or defender not in new_chart:
+            parser.error(f"Unknown type in --set {attacker} {defender}. Available: {list(new_chart)}")
+        new_chart[attacker][defender] = multiplier
+
+    try:
+        patched = apply_delta(args.generation, new_chart, output_dir=args.output_dir)
+    except (ValueError, FileNotFoundError) as e:
+        parser.error(str(e))
+    suffix = generation_suffix(args.generation)
+    for arity, count in patched.items():
+        print(f"{args.generation}: patched {count} rows of {os.path.basename(tier_path(args.output_dir, arity, suffix))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# Vectorised type effectiveness engine
+# Turns a type chart into an attacker x defender matrix once and works out the
+# defensive and offensive multipliers for every type combination as batched
+# NumPy operations instead of walking the nested chart dicts per combo.
+import itertools
+import math
+
+import numpy as np
+
+ANALYSIS_KEYS = ("Weaknesses", "Resistances", "Immunities", "Neutrals",
+                 "Coverage", "Offensive_Resistances", "Offensive_Immunities")
+
+
+def build_matrix(type_chart):
+    """
+    Converts a type chart ({attacker: {defender: multiplier}}) into
+    (type_names, matrix) where matrix[attacker_id, defender_id] is the
+    multiplier. Matchups missing from the chart default to 1.0, the same as
+    the .get(..., 1.0) lookups used throughout the build scripts.
+    """
+    type_names = list(type_chart.keys())
+    matrix = np.ones((len(type_names), len(type_names)), dtype=np.float64)
+    for a, attacker in enumerate(type_names):
+        for d, defender in enumerate(type_names):
+            matrix[a, d] = type_chart[attacker].get(defender, 1.0)
+    return type_names, matrix
+
+
+def combo_indices(n_types, arity):
+    """
+    Returns an (n_combos, arity) array of sorted type id tuples in the same
+    order as itertools.combinations(range(n_types), arity).
+    """
+    combos = np.fromiter(itertools.chain.from_iterable(itertools.combinations(range(n_types), arity)), dtype=np.intp)
+    return combos.reshape(-1, arity)
+
+
+def binomial_table(n, k_max):
+    """Returns an (n + 1, k_max + 1) int64 table where table[x, j] == C(x, j)."""
+    return np.array([[math.comb(x, j) for j in range(k_max + 1)] for x in range(n + 1)], dtype=np.int64)
+
+
+def combo_ranks(combos, binomials):
+    """
+    Combinatorial number system (colex) rank of each sorted type id tuple:
+    rank = sum(C(c_i, i + 1)). Ranks of all k-combos of n types are exactly
+    0 .. C(n, k) - 1, so they can index a packed array directly.
+    """
+    combos = np.asarray(combos, dtype=np.intp)
+    return binomials[combos, np.arange(1, combos.shape[-1] + 1)].sum(axis=-1)
+
+
+def defensive_multipliers(matrix, combos):
+    """
+    For each combo (row of type ids), the multiplier every attacking type
+    deals to it: the product of the attacker's effectiveness against each
+    member type. Returns an (n_combos, n_types) array indexed [combo, attacker].
+    """
+    return matrix.T[combos].prod(axis=1)
+
+
+def offensive_multipliers(matrix, combos):
+    """
+    For each combo, the product of its member types' effectiveness against
+    every defending type. Returns an (n_combos, n_types) array indexed
+    [combo, defender].
+    """
+    return matrix[combos].prod(axis=1)
+
+
+class TypeEngine:
+    """
+    Holds the effectiveness matrix for one type chart and lazily computes
+    (and caches) the combo tables for each arity.
+    """
+
+    def __init__(self, type_chart):
+        self.type_names, self.matrix = build_matrix(type_chart)
+        self.type_ids = {name: idx for idx, name in enumerate(self.type_names)}
+        self._tables = {}
+
+    def table(self, arity):
+        """
+        Returns {"combos", "defensive", "offensive"} for every combination of
+        `arity` distinct types, computed once per engine.
+        """
+        if arity not in self._tables:
+            combos = combo_indices(len(self.type_names), arity)
+            self._tables[arity] = {
+                "combos": combos,
+                "defensive": defensive_multipliers(self.matrix, combos),
+                "offensive": offensive_multipliers(self.matrix, combos),
+            }
+        return self._tables[arity]
+
+    def compute_all(self, arities=(1, 2, 3)):
+        """Computes the combo tables for every requested arity in one go."""
+        return {arity: self.table(arity) for arity in arities}
+
+    def ids_for(self, type_names):
+        """Converts a sequence of type names to ids, raising KeyError on unknown names."""
+        ids = []
+        for name in type_names:
+            if name not in self.type_ids:
+                raise KeyError(f"Type '{name}' not found in type chart. Available: {self.type_names}")
+            ids.append(self.type_ids[name])
+        return ids
+
+    def multipliers(self, type_names):
+        """Returns (defensive, offensive) multiplier rows for a single combo."""
+        combos = np.array([self.ids_for(type_names)], dtype=np.intp)
+        return defensive_multipliers(self.matrix, combos)[0], offensive_multipliers(self.matrix, combos)[0]
+
+    def analysis(self, type_names):
+        """Dict view of one combo in the format returned by pkmtypes.get_*_strengths_weaknesses."""
+        defensive, offensive = self.multipliers(type_names)
+        return analysis_view(self.type_names, defensive, offensive)
+
+
+def analysis_view(type_names, defensive, offensive):
+    """
+    Builds the legacy seven-dict analysis from one combo's defensive and
+    offensive multiplier rows. Keys are listed in type chart order.
+    """
+    weaknesses = {}
+    resistances = {}
+    immunities = {}
+    neutrals = {}
+    coverage = {}
+    offensive_resistances = {}
+    offensive_immunities = {}
+
+    for name, effectiveness in zip(type_names, defensive.tolist()):
+        if effectiveness == 1.0:
+            neutrals[name] = effectiveness
+        elif effectiveness > 1.0:
+            weaknesses[name] = effectiveness
+        elif effectiveness > 0.0:
+            resistances[name] = effectiveness
+        else:
+            immunities[name] = effectiveness
+
+    for name, effectiveness in zip(type_names, offensive.tolist()):
+        if effectiveness >= 2.0:
+            coverage[name] = effectiveness
+        elif effectiveness == 0.5:
+            offensive_resistances[name] = effectiveness
+        elif effectiveness == 0.0:
+            offensive_immunities[name] = effectiveness
+
+    return dict(zip(ANALYSIS_KEYS, (weaknesses, resistances, immunities, neutrals,
+                                    coverage, offensive_resistances, offensive_immunities)))
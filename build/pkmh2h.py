@@ -0,0 +1,194 @@
+# Combo-vs-combo head-to-head matrix (pkm-h2h.bin)
+# For every pair of mono, dual and tri type combos (A, B), the best STAB
+# multiplier A can hit B with: the highest, over A's types, of that type's
+# effectiveness against all of B's types. The matrix is built blockwise from
+# the type chart straight into a memory-mapped file, so neither building nor
+# querying it ever needs the whole thing in memory.
+#
+# Layout (little-endian), the same container as pkm-score.bin (see
+# pkmscore.ComboRows) with rows and columns in its combo order (arity tiers in
+# turn, colex rank within a tier):
+#   magic b"PKMH" | uint16 format version | uint32 header length
+#   header: UTF-8 JSON {"generation", "type_ids", "arities", "offsets", "counts"}
+#   zero padding up to a 16-byte boundary
+#   float16[total_combos, total_combos]: [attacker combo, defender combo]
+#   multiplier, exact like pkm-score.bin's (see pkmscore.to_float16)
+#
+# Usage:
+#   python build/pkmh2h.py build [GEN9 GEN1 GEN5]
+#   python build/pkmh2h.py beats GEN9 Fire/Water [-n 10]
+#   python build/pkmh2h.py walls GEN9 Fire/Water [-n 10]
+import argparse
+import os
+import sys
+
+import numpy as np
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+
+from pkmengine import binomial_table, combo_indices, combo_ranks, defensive_multipliers
+from pkmscore import ComboRows, container_header, tier_layout, to_float16
+
+MAGIC = b"PKMH"
+FORMAT_VERSION = 2
+# Attacking combos per block; each block holds a (BLOCK_SIZE, total_combos)
+# slice of the matrix
+BLOCK_SIZE = 256
+
+
+def write_matchups(filename, engine, generation, arities=(1, 2, 3), block_size=BLOCK_SIZE):
+    """
+    Builds the head-to-head matrix of a TypeEngine's combos block by block
+    into `filename`. The file is written next to the target and swapped in,
+    so readers that have the old one mapped keep a consistent copy.
+    Raises ValueError if a multiplier can't be stored exactly.
+    """
+    n_types = len(engine.type_names)
+    binomials = binomial_table(n_types, max(arities))
+    offsets, counts = tier_layout(binomials, n_types, arities)
+
+    # Every combo as a defender: the multiplier of each attacking type against it
+    tiers = {arity: combo_indices(n_types, arity) for arity in arities}
+    defender_multipliers = np.empty((sum(counts), n_types), dtype="<f2")
+    for arity, offset in zip(arities, offsets):
+        rows = offset + combo_ranks(tiers[arity], binomials)
+        defender_multipliers[rows] = to_float16(defensive_multipliers(engine.matrix, tiers[arity]))
+
+    temp_path = f"{filename}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(container_header(MAGIC, FORMAT_VERSION, generation, engine.type_ids, arities, offsets, counts))
+        # Attacker rows are written tier by tier in colex rank order, i.e.
+        # file order
+        for arity in arities:
+            combos = tiers[arity][np.argsort(combo_ranks(tiers[arity], binomials))]
+            for start in range(0, len(combos), block_size):
+                block = combos[start:start + block_size]
+                # defender_multipliers[:, block] is (defenders, attackers, arity)
+                f.write(np.ascontiguousarray(defender_multipliers[:, block].max(axis=2).T).tobytes())
+    os.replace(temp_path, filename)
+
+
+class MatchupMatrix(ComboRows):
+    """
+    Memory-mapped view of a pkm-h2h.bin file. multipliers[a, b] is the best
+    multiplier combo row a hits combo row b with; rows are addressed exactly
+    like ScoreArtifact rows.
+    """
+
+    MAGIC = MAGIC
+    FORMAT_VERSION = FORMAT_VERSION
+    KIND = "pkm head-to-head matrix"
+
+    def __init__(self, filename, block_size=BLOCK_SIZE):
+        super().__init__(filename)
+        self._block_size = block_size
+        self._wins = None
+        self.multipliers = np.memmap(filename, dtype="<f2", mode="r", offset=self.data_offset,
+                                     shape=(self.total, self.total))
+
+        # Type ids of every row, for turning query results back into names
+        self.combos = [None] * self.total
+        for arity in self.arities:
+            tier = combo_indices(len(self.type_names), arity)
+            for row, combo in zip(self.indices(tier).tolist(), tier.tolist()):
+                self.combos[row] = combo
+
+    def names(self, row):
+        return [self.type_names[t] for t in self.combos[row]]
+
+    def multiplier(self, attacker, defender):
+        """Best STAB multiplier the attacking combo hits the defending combo with (type name lists)."""
+        return float(self.multipliers[self.index_names(attacker), self.index_names(defender)])
+
+    def win_counts(self):
+        """
+        Number of combos each combo beats, i.e. hits harder than they hit it
+        back. Computed one block of rows at a time on first use.
+        """
+        if self._wins is None:
+            total = self.multipliers.shape[0]
+            wins = np.empty(total, dtype=np.int64)
+            for start in range(0, total, self._block_size):
+                stop = min(start + self._block_size, total)
+                wins[start:stop] = (self.multipliers[start:stop] > self.multipliers[:, start:stop].T).sum(axis=1)
+            self._wins = wins
+        return self._wins
+
+    def beats(self, type_names, n=10):
+        """
+        Top-n combos that beat the given combo, as (names, multiplier dealt,
+        multiplier taken): hardest hitters first, then those it hits least.
+        """
+        row = self.index_names(type_names)
+        dealt = np.asarray(self.multipliers[:, row], dtype=np.float64)
+        taken = np.asarray(self.multipliers[row], dtype=np.float64)
+        rows = np.flatnonzero(dealt > taken)
+        # Biggest ratio first (infinite when it's immune to them), then raw damage dealt
+        with np.errstate(divide="ignore"):
+            margin = np.log2(dealt[rows]) - np.log2(taken[rows])
+        return self._describe(rows[np.lexsort((-dealt[rows], -margin))[:n]], dealt, taken)
+
+    def walls(self, type_names, n=10):
+        """
+        Combos the given combo walls: every one of their STAB types is
+        resisted or doesn't affect it. Returns up to n (names, multiplier
+        dealt, multiplier taken), most thoroughly walled first.
+        """
+        row = self.index_names(type_names)
+        dealt = np.asarray(self.multipliers[:, row], dtype=np.float64)
+        taken = np.asarray(self.multipliers[row], dtype=np.float64)
+        rows = np.flatnonzero(dealt < 1.0)
+        # Weakest hits first, then the ones it hits hardest
+        return self._describe(rows[np.lexsort((-taken[rows], dealt[rows]))[:n]], dealt, taken)
+
+    def _describe(self, rows, dealt, taken):
+        dealt = dealt[rows].tolist()
+        taken = taken[rows].tolist()
+        return [(self.names(row), d, t) for row, d, t in zip(rows.tolist(), dealt, taken)]
+
+
+def build_matchups(generations, arities=(1, 2, 3)):
+    """Writes pkm-h2h{GEN}.bin for each generation. Returns the files written."""
+    from pkmbuild import load_type_chart, matchup_path
+    from pkmengine import TypeEngine
+
+    written = []
+    for gen in generations:
+        path = matchup_path(gen)
+        write_matchups(path, TypeEngine(load_type_chart(gen)), gen, arities)
+        written.append(path)
+    return written
+
+
+def main(argv=None):
+    from pkmbuild import GENERATIONS, matchup_path
+
+    parser = argparse.ArgumentParser(description="Build or query the combo-vs-combo head-to-head matrix.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="Write pkm-h2h{GEN}.bin into build/.")
+    build_parser.add_argument("generations", nargs="*", default=list(GENERATIONS),
+                              help=f"Generations to build (default: all of {', '.join(GENERATIONS)}).")
+    for command, help_text in (("beats", "Combos that beat a combo."), ("walls", "Combos a combo walls.")):
+        query_parser = commands.add_parser(command, help=help_text)
+        query_parser.add_argument("generation", choices=list(GENERATIONS))
+        query_parser.add_argument("combo", help="Type names joined with '/', e.g. Fire/Water.")
+        query_parser.add_argument("-n", type=int, default=10, help="How many combos to list (default: 10).")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        for gen in args.generations:
+            if gen not in GENERATIONS:
+                parser.error(f"Unknown generation '{gen}'. Available: {list(GENERATIONS)}")
+        for path in build_matchups(args.generations):
+            print(f"wrote {os.path.relpath(path)}")
+        return
+
+    matchups = MatchupMatrix(matchup_path(args.generation))
+    query = matchups.beats if args.command == "beats" else matchups.walls
+    for names, dealt, taken in query(args.combo.split('/'), n=args.n):
+        print(f"{'/'.join(names):<28} deals x{dealt:g}, takes x{taken:g}")
+
+
+if __name__ == "__main__":
+    main()
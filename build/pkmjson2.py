@@ -1,3 +1,4 @@
+import argparse
 import json
 import importlib.util
 import os
@@ -8,49 +9,33 @@ if spec and spec.loader:
     pkmtypes = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(pkmtypes)
     type_chart = pkmtypes.type_chart
-    get_defensive_strengths_weaknesses = pkmtypes.get_defensive_strengths_weaknesses
-    get_dual_type_defensive_strengths_weaknesses = pkmtypes.get_dual_type_defensive_strengths_weaknesses
-    get_tri_type_defensive_strengths_weaknesses = pkmtypes.get_tri_type_defensive_strengths_weaknesses
 else:
     raise FileNotFoundError("pkmtypes.py not found in the same directory. Please make sure the file is present.")
 
-type_ids = {type_name: idx for idx, type_name in enumerate(type_chart.keys())}
+from pkmengine import analysis_view
+from pkmscore import write_artifact
+
+engine = pkmtypes.engine
+type_ids = engine.type_ids
 
 def export_results_to_json(filename="pkm-score.json"):
+    """Debug export: the same combos as the binary artifact, as readable JSON."""
     results = []
-    # Analyze all single types
-    for pokemon_type, type_id in type_ids.items():
-        analysis = get_defensive_strengths_weaknesses(pokemon_type)
-        results.append({"types": [type_id], **flatten_analysis(analysis)})
-
-    # Analyze all dual types
-    seen_dual_types = set()
-    for type1, id1 in type_ids.items():
-        for type2, id2 in type_ids.items():
-            if id1 != id2:
-                dual_types_sorted = tuple(sorted([id1, id2]))
-                if dual_types_sorted not in seen_dual_types:
-                    seen_dual_types.add(dual_types_sorted)
-                    analysis = get_dual_type_defensive_strengths_weaknesses(f"{type1}/{type2}")
-                    results.append({"types": list(dual_types_sorted), **flatten_analysis(analysis)})
-
-    # Analyze all tri types (just for demonstration, could be exhaustive)
-    seen_tri_types = set()
-    for type1, id1 in type_ids.items():
-        for type2, id2 in type_ids.items():
-            for type3, id3 in type_ids.items():
-                if len({id1, id2, id3}) == 3:
-                    tri_types_sorted = tuple(sorted([id1, id2, id3]))
-                    if tri_types_sorted not in seen_tri_types:
-                        seen_tri_types.add(tri_types_sorted)
-                        analysis = get_tri_type_defensive_strengths_weaknesses(f"{type1}/{type2}/{type3}")
-                        results.append({"types": list(tri_types_sorted), **flatten_analysis(analysis)})
+    # Analyze all single, dual and tri types (sorted ids, each combo once)
+    for arity, table in engine.compute_all((1, 2, 3)).items():
+        for combo, defensive, offensive in zip(table["combos"].tolist(), table["defensive"], table["offensive"]):
+            analysis = analysis_view(engine.type_names, defensive, offensive)
+            results.append({"types": combo, **flatten_analysis(analysis)})
 
     # Write results to JSON file
     with open(os.path.join(os.path.dirname(__file__), filename), "w") as json_file:
         json.dump({"type_ids": type_ids, "results": results}, json_file, separators=(',', ':'), indent=None)
     print(f"Results successfully exported to {filename}")
 
+def export_results_to_binary(filename="pkm-score.bin", generation="GEN9"):
+    write_artifact(os.path.join(os.path.dirname(__file__), filename), engine, generation)
+    print(f"Results successfully exported to {filename}")
+
 def flatten_analysis(analysis):
     return {
         "w": [{"type": k, "score": v} for k, v in analysis["Weaknesses"].items()],
@@ -63,4 +48,10 @@ def flatten_analysis(analysis):
     }
 
 if __name__ == "__main__":
-    export_results_to_json()
+    parser = argparse.ArgumentParser(description="Build the packed pkm-score.bin artifact from pkmtypes.py.")
+    parser.add_argument("--generation", default="GEN9", help="Generation label stored in the artifact header.")
+    parser.add_argument("--json", action="store_true", help="Also write pkm-score.json for debugging.")
+    args = parser.parse_args()
+    export_results_to_binary(generation=args.generation)
+    if args.json:
+        export_results_to_json()
@@ -0,0 +1,195 @@
+# Packed binary score artifact (pkm-score.bin)
+# Replaces the list-of-objects pkm-score.json with one float16 multiplier block
+# per combo, addressed by the combinatorial rank of its sorted type ids, so a
+# lookup is a single offset calculation into a memory-mapped file.
+#
+# Layout (little-endian):
+#   magic b"PKMS" | uint16 format version | uint32 header length
+#   header: UTF-8 JSON {"generation", "type_ids", "arities", "offsets", "counts"}
+#   zero padding up to a 16-byte boundary
+#   float16[total_combos, 2, n_types]: [combo, 0] defensive multipliers per
+#   attacking type, [combo, 1] offensive multipliers per defending type
+#
+# The multipliers the shipped type charts produce (0, 1/8 .. 8) are exact in
+# float16. to_float16() refuses any value that isn't (e.g. 1.2 from a custom
+# chart) instead of storing a rounded one.
+#
+# pkm-h2h.bin (see pkmh2h.py) uses the same prefix, header and row order with
+# its own magic and data; container_header() and ComboRows are shared by both.
+import json
+import os
+import struct
+
+import numpy as np
+
+from pkmengine import binomial_table, combo_ranks
+
+MAGIC = b"PKMS"
+FORMAT_VERSION = 1
+PREFIX = struct.Struct("<4sHI")
+ALIGNMENT = 16
+DEFENSIVE = 0
+OFFENSIVE = 1
+
+
+def to_float16(multipliers):
+    """Multipliers as float16, raising ValueError if any can't be held exactly."""
+    multipliers = np.asarray(multipliers, dtype=np.float64)
+    packed = multipliers.astype("<f2")
+    inexact = packed.astype(np.float64) != multipliers
+    if inexact.any():
+        raise ValueError(f"Multiplier {float(multipliers[inexact].flat[0])!r} can't be stored exactly in a pkm score "
+                         "artifact (float16); use values such as 1.5 or 0.75 that can.")
+    return packed
+
+
+def tier_layout(binomials, n_types, arities):
+    """(offsets, counts): the first row and number of rows of each arity's tier."""
+    offsets, counts = [], []
+    total = 0
+    for arity in arities:
+        offsets.append(total)
+        counts.append(int(binomials[n_types, arity]))
+        total += counts[-1]
+    return offsets, counts
+
+
+def container_header(magic, version, generation, type_ids, arities, offsets, counts):
+    """Prefix, JSON header and padding of a combo-row file; the data starts right after."""
+    header = json.dumps({
+        "generation": generation,
+        "type_ids": type_ids,
+        "arities": list(arities),
+        "offsets": offsets,
+        "counts": counts,
+    }, separators=(',', ':')).encode("utf-8")
+    data_offset = -(-(PREFIX.size + len(header)) // ALIGNMENT) * ALIGNMENT
+    return PREFIX.pack(magic, version, len(header)) + header + b"\0" * (data_offset - PREFIX.size - len(header))
+
+
+def write_artifact(filename, engine, generation, arities=(1, 2, 3)):
+    """
+    Packs the combo tables of a TypeEngine into a binary artifact. The file
+    is written next to the target and swapped in, so a server that has the
+    old one mapped keeps reading a consistent copy instead of a truncated
+    file.
+    """
+    n_types = len(engine.type_names)
+    binomials = binomial_table(n_types, max(arities))
+    offsets, counts = tier_layout(binomials, n_types, arities)
+
+    blocks = np.empty((sum(counts), 2, n_types), dtype="<f2")
+    for arity, offset in zip(arities, offsets):
+        table = engine.table(arity)
+        rows = offset + combo_ranks(table["combos"], binomials)
+        blocks[rows, DEFENSIVE] = to_float16(table["defensive"])
+        blocks[rows, OFFENSIVE] = to_float16(table["offensive"])
+
+    temp_path = f"{filename}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(container_header(MAGIC, FORMAT_VERSION, generation, engine.type_ids, arities, offsets, counts))
+        f.write(blocks.tobytes())
+    os.replace(temp_path, filename)
+
+
+class ComboRows:
+    """
+    Header and row addressing of a file with one row per type combo (arity
+    tiers in turn, colex rank within a tier). Subclasses set MAGIC,
+    FORMAT_VERSION and KIND, and map their data from data_offset.
+    """
+
+    MAGIC = None
+    FORMAT_VERSION = None
+    KIND = None
+
+    def __init__(self, filename):
+        with open(filename, "rb") as f:
+            magic, version, header_len = PREFIX.unpack(f.read(PREFIX.size))
+            if magic != self.MAGIC:
+                raise ValueError(f"{filename} is not a {self.KIND}.")
+            if version != self.FORMAT_VERSION:
+                raise ValueError(f"Unsupported {self.KIND} version {version} in {filename}.")
+            header = json.loads(f.read(header_len).decode("utf-8"))
+
+        self.filename = filename
+        self.generation = header["generation"]
+        self.type_ids = header["type_ids"]
+        self.type_names = list(self.type_ids.keys())
+        self.arities = header["arities"]
+        self.total = sum(header["counts"])
+        self.data_offset = -(-(PREFIX.size + header_len) // ALIGNMENT) * ALIGNMENT
+        self._offsets = dict(zip(self.arities, header["offsets"]))
+        self._counts = dict(zip(self.arities, header["counts"]))
+        self._binomials = binomial_table(len(self.type_names), max(self.arities))
+
+    def ids_for(self, type_names):
+        """Converts type names to ids, raising KeyError on unknown names."""
+        ids = []
+        for name in type_names:
+            if name not in self.type_ids:
+                raise KeyError(f"Type '{name}' not found in type_ids. Available: {self.type_names}")
+            ids.append(self.type_ids[name])
+        return ids
+
+    def index(self, type_ids):
+        """Row of the combo made of `type_ids` (any order, no repeats)."""
+        ids = sorted(type_ids)
+        arity = len(ids)
+        if arity not in self._offsets:
+            raise ValueError(f"No {arity}-type combos in {self.filename}. Available arities: {self.arities}")
+        if len(set(ids)) != arity:
+            raise ValueError(f"Type ids must be distinct, got {list(type_ids)}.")
+        rank = 0
+        for position, type_id in enumerate(ids, start=1):
+            rank += int(self._binomials[type_id, position])
+        return self._offsets[arity] + rank
+
+    def indices(self, combos):
+        """Vectorised index() for an (n_combos, arity) array of type ids."""
+        combos = np.sort(np.asarray(combos, dtype=np.intp), axis=1)
+        return self._offsets[combos.shape[1]] + combo_ranks(combos, self._binomials)
+
+    def index_names(self, type_names):
+        """index() by type name, e.g. ['Fire', 'Water']."""
+        return self.index(self.ids_for(type_names))
+
+
+class ScoreArtifact(ComboRows):
+    """
+    Memory-mapped view of a pkm-score.bin file. Only the small header is
+    parsed on open; lookups index straight into the mapped array. Opened
+    read-only by default; mode="r+" allows rows to be patched in place.
+    """
+
+    MAGIC = MAGIC
+    FORMAT_VERSION = FORMAT_VERSION
+    KIND = "pkm score artifact"
+
+    def __init__(self, filename, mode="r"):
+        super().__init__(filename)
+        self.blocks = np.memmap(filename, dtype="<f2", mode=mode, offset=self.data_offset,
+                                shape=(self.total, 2, len(self.type_names)))
+
+    def lookup(self, type_ids):
+        """Returns (defensive, offensive) float16 multiplier rows for one combo."""
+        block = self.blocks[self.index(type_ids)]
+        return block[DEFENSIVE], block[OFFENSIVE]
+
+    def lookup_names(self, type_names):
+        """lookup() by type name, e.g. ['Poison', 'Water']."""
+        return self.lookup(self.ids_for(type_names))
+
+    def chart_matrix(self):
+        """
+        The attacker x defender matrix the artifact was built from: a
+        monotype's defensive row is its column of the type chart.
+        """
+        defensive, _ = self.tier(1)
+        return np.asarray(defensive, dtype=np.float64).T.copy()
+
+    def tier(self, arity):
+        """All (defensive, offensive) rows for one arity, in colex rank order."""
+        start = self._offsets[arity]
+        block = self.blocks[start:start + self._counts[arity]]
+        return block[:, DEFENSIVE], block[:, OFFENSIVE]
@@ -0,0 +1,342 @@
+# Team coverage optimiser
+# Picks the best team of k mono/dual/tri type combos (k <= 6) for a
+# generation: as much offensive coverage as possible (each target type scored
+# by the best multiplier any team member's STAB types hit it with, the
+# max-merge from pkm-off2.calculate_offensive_score) for as few shared
+# weaknesses as possible (the 'Weaknesses' pkm-def.py reads from the score
+# artifact).
+#
+# Every combo's coverage and weaknesses are bitsets over the target/attacking
+# types, so merging a member into a team is a handful of ORs and popcounts.
+# The search is a depth-first branch and bound over the combos, evaluating all
+# children of a node at once and pruning any whose best possible completion
+# can't beat the best team found so far. Subtrees under each first member run
+# in a pool of worker processes, stop at a time budget, and every improvement
+# is reported as soon as it is found.
+#
+# Usage: python build/pkmteam.py GEN9 [-k 6] [--time 60] [--jobs N] [--arities 1 2 3]
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+
+from pkmbuild import GENERATIONS, OFFENSIVE_POINTS, artifact_path
+from pkmengine import combo_indices
+from pkmscore import DEFENSIVE, ScoreArtifact
+
+MAX_TEAM_SIZE = 6
+# Points lost for every extra team member weak to a type someone on the team
+# is already weak to (a x2 weakness costs 2 points in the defensive score)
+SHARED_WEAKNESS_PENALTY = 2.0
+# Coverage and weakness bitsets are uint32, one bit per type
+MAX_TYPES = 32
+
+
+def popcount(bits):
+    return np.bitwise_count(bits).astype(np.int64)
+
+
+def to_bits(mask):
+    """(n_combos, n_types) boolean array -> uint32 bitset per combo (bit t = type id t)."""
+    weights = np.left_shift(np.uint32(1), np.arange(mask.shape[1], dtype=np.uint32))
+    return (mask * weights).sum(axis=1, dtype=np.uint32)
+
+
+def offensive_points(super_effective, neutral, resisted, n_types):
+    """
+    Offensive score from a team's merged coverage bitsets: the types hit for
+    at least x2, at least x1 and at least x0.5. Everything else is immune.
+    """
+    n_super_effective = popcount(super_effective)
+    n_neutral = popcount(neutral)
+    n_resisted = popcount(resisted)
+    return (OFFENSIVE_POINTS[2.0] * n_super_effective
+            + OFFENSIVE_POINTS[1.0] * (n_neutral - n_super_effective)
+            + OFFENSIVE_POINTS[0.5] * (n_resisted - n_neutral)
+            + OFFENSIVE_POINTS[0.0] * (n_types - n_resisted))
+
+
+class TeamPool:
+    """
+    The candidate combos of one generation as bitsets, ordered best single
+    member first so the search meets good teams early:
+      super_effective / neutral / resisted - target types the combo's best
+                                             STAB hits for >= x2 / x1 / x0.5
+      weak                                 - attacking types that hit it for > x1
+    """
+
+    def __init__(self, artifact, arities=(1, 2, 3)):
+        self.type_names = artifact.type_names
+        self.n_types = len(self.type_names)
+        if self.n_types > MAX_TYPES:
+            raise ValueError(f"Team search supports up to {MAX_TYPES} types, {artifact.filename} has {self.n_types}.")
+        # A monotype's row is its type id, so these are the single-type
+        # offensive maps pkm-off2 merges
+        _, mono_offensive = artifact.tier(1)
+        mono_offensive = np.asarray(mono_offensive, dtype=np.float64)
+
+        combos, offensive, defensive = [], [], []
+        for arity in arities:
+            tier = combo_indices(self.n_types, arity)
+            combos.extend(tier.tolist())
+            offensive.append(mono_offensive[tier].max(axis=1))
+            defensive.append(np.asarray(artifact.blocks[artifact.indices(tier), DEFENSIVE], dtype=np.float64))
+        offensive = np.concatenate(offensive)
+        defensive = np.concatenate(defensive)
+
+        super_effective = to_bits(offensive >= 2.0)
+        neutral = to_bits(offensive >= 1.0)
+        resisted = to_bits(offensive >= 0.5)
+        weak = to_bits(defensive > 1.0)
+        order = np.lexsort((popcount(weak), -offensive_points(super_effective, neutral, resisted, self.n_types)))
+
+        self.combos = [combos[i] for i in order.tolist()]
+        self.bits = {
+            "super_effective": super_effective[order],
+            "neutral": neutral[order],
+            "resisted": resisted[order],
+            "weak": weak[order],
+        }
+
+    def __len__(self):
+        return len(self.combos)
+
+    def names(self, member):
+        return '/'.join(self.type_names[t] for t in self.combos[member])
+
+    def describe(self, members, penalty=SHARED_WEAKNESS_PENALTY):
+        """Scores a team (pool indices) and lists what it covers and where it's exposed."""
+        merged = {name: np.bitwise_or.reduce(bits[members]) for name, bits in self.bits.items()}
+        shared, weak_so_far = 0, np.uint32(0)
+        for member in members:
+            shared += int(popcount(self.bits["weak"][member] & weak_so_far))
+            weak_so_far |= self.bits["weak"][member]
+        offensive = float(offensive_points(merged["super_effective"], merged["neutral"],
+                                           merged["resisted"], self.n_types))
+        return {
+            "team": [self.names(member) for member in members],
+            "score": offensive - penalty * shared,
+            "offensive_score": offensive,
+            "shared_weaknesses": shared,
+            "coverage": [name for t, name in enumerate(self.type_names) if merged["super_effective"] >> t & 1],
+            "weak_to": [name for t, name in enumerate(self.type_names) if merged["weak"] >> t & 1],
+        }
+
+
+def suffix_unions(bits):
+    """suffix[i] = OR of bits[i:], with suffix[len(bits)] = 0."""
+    suffix = np.zeros(len(bits) + 1, dtype=np.uint32)
+    suffix[:-1] = np.bitwise_or.accumulate(bits[::-1])[::-1]
+    return suffix
+
+
+# Per-process search data, set once by init_worker instead of being sent with every task
+_worker = {}
+
+
+def init_worker(bits, n_types, k, penalty):
+    _worker.update(bits=bits, n_types=n_types, k=k, penalty=penalty,
+                   suffix={name: suffix_unions(b) for name, b in bits.items()})
+
+
+def root_bound(root):
+    """Best score any team whose first member is `root` could reach."""
+    bits, suffix = _worker["bits"], _worker["suffix"]
+    return float(offensive_points(bits["super_effective"][root] | suffix["super_effective"][root + 1],
+                                  bits["neutral"][root] | suffix["neutral"][root + 1],
+                                  bits["resisted"][root] | suffix["resisted"][root + 1], _worker["n_types"]))
+
+
+def search_root(root, incumbent, deadline):
+    """
+    Branch and bound over every team whose first member is `root` (members
+    are taken in pool order). Returns (best score, team or None if nothing
+    beat `incumbent`, nodes visited, whether the subtree was finished).
+    """
+    bits, suffix = _worker["bits"], _worker["suffix"]
+    n_types, k, penalty = _worker["n_types"], _worker["k"], _worker["penalty"]
+    n = len(bits["weak"])
+    state = {"best": incumbent, "team": None, "nodes": 0, "finished": True}
+
+    def visit(members, super_effective, neutral, resisted, weak, shared):
+        state["nodes"] += 1
+        if time.time() > deadline:
+            state["finished"] = False
+            return
+        remaining = k - len(members)
+        start, stop = members[-1] + 1, n - remaining + 1
+        if start >= stop:
+            return
+        # Every child at once: the team with member j added, for j in [start, stop)
+        child_se = super_effective | bits["super_effective"][start:stop]
+        child_ne = neutral | bits["neutral"][start:stop]
+        child_rs = resisted | bits["resisted"][start:stop]
+        child_shared = shared + popcount(bits["weak"][start:stop] & weak)
+
+        if remaining == 1:
+            scores = offensive_points(child_se, child_ne, child_rs, n_types) - penalty * child_shared
+            best = int(np.argmax(scores))
+            if scores[best] > state["best"]:
+                state["best"] = float(scores[best])
+                state["team"] = members + [start + best]
+            return
+
+        # Shared weaknesses never go down, and coverage can at most grow to
+        # everything the combos after the child cover
+        after = slice(start + 1, stop + 1)
+        bounds = (offensive_points(child_se | suffix["super_effective"][after], child_ne | suffix["neutral"][after],
+                                   child_rs | suffix["resisted"][after], n_types) - penalty * child_shared)
+        candidates = np.flatnonzero(bounds > state["best"])
+        for child in candidates[np.argsort(-bounds[candidates], kind="stable")].tolist():
+            if bounds[child] <= state["best"]:
+                break
+            visit(members + [start + child], child_se[child], child_ne[child], child_rs[child],
+                  weak | bits["weak"][start + child], int(child_shared[child]))
+            if not state["finished"]:
+                return
+
+    if k == 1:
+        score = float(offensive_points(bits["super_effective"][root], bits["neutral"][root],
+                                       bits["resisted"][root], n_types))
+        if score > incumbent:
+            return score, [root], 1, True
+        return incumbent, None, 1, True
+    if root_bound(root) > incumbent:
+        visit([root], bits["super_effective"][root], bits["neutral"][root], bits["resisted"][root],
+              bits["weak"][root], 0)
+    return state["best"], state["team"], state["nodes"], state["finished"]
+
+
+def greedy_team(pool, k, penalty):
+    """A quick starting team: repeatedly add whichever combo raises the score most."""
+    members = []
+    merged = {name: np.uint32(0) for name in pool.bits}
+    shared = 0
+    for _ in range(k):
+        added_shared = popcount(pool.bits["weak"] & merged["weak"])
+        scores = (offensive_points(merged["super_effective"] | pool.bits["super_effective"],
+                                   merged["neutral"] | pool.bits["neutral"],
+                                   merged["resisted"] | pool.bits["resisted"], pool.n_types)
+                  - penalty * (shared + added_shared))
+        scores[members] = -np.inf
+        member = int(np.argmax(scores))
+        shared += int(added_shared[member])
+        members.append(member)
+        for name in merged:
+            merged[name] |= pool.bits[name][member]
+    return sorted(members)
+
+
+def search_teams(gen, k=MAX_TEAM_SIZE, time_budget=60.0, jobs=None, arities=(1, 2, 3),
+                 penalty=SHARED_WEAKNESS_PENALTY, artifact=None):
+    """
+    Searches for the best k-member team of a generation's combos, yielding
+    a result dict (see TeamPool.describe, plus "nodes", "elapsed",
+    "optimal" and "done") for the starting team, for every better team
+    found, and once more when the search ends. "optimal" is True when the
+    whole space was covered within `time_budget` seconds.
+
+    Subtrees are farmed out to `jobs` worker processes (default: one per
+    CPU); each subtree starts from the best score known when it is handed
+    out.
+    """
+    if not 1 <= k <= MAX_TEAM_SIZE:
+        raise ValueError(f"Team size must be between 1 and {MAX_TEAM_SIZE}, got {k}.")
+    if gen not in GENERATIONS:
+        raise KeyError(f"Unknown generation '{gen}'. Available: {list(GENERATIONS)}")
+    if penalty < 0:
+        raise ValueError("The shared weakness penalty can't be negative; the search bounds rely on it.")
+    started = time.time()
+    deadline = started + time_budget
+    pool = TeamPool(ScoreArtifact(artifact or artifact_path(gen)), arities)
+    if k > len(pool):
+        raise ValueError(f"Only {len(pool)} combos to pick a team of {k} from.")
+
+    team = greedy_team(pool, k, penalty)
+    best = pool.describe(team, penalty)
+    nodes = 0
+    yield dict(best, nodes=nodes, elapsed=time.time() - started, optimal=False, done=False)
+
+    initargs = (pool.bits, pool.n_types, k, penalty)
+    roots = iter(range(len(pool) - k + 1))
+    finished = True
+    if jobs == 1:
+        init_worker(*initargs)
+        for root in roots:
+            score, found, visited, complete = search_root(root, best["score"], deadline)
+            nodes += visited
+            finished &= complete
+            if found is not None and score > best["score"]:
+                best = pool.describe(found, penalty)
+                yield dict(best, nodes=nodes, elapsed=time.time() - started, optimal=False, done=False)
+            if not complete:
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=initargs) as executor:
+            in_flight = set()
+            workers = jobs or os.cpu_count() or 1
+            while True:
+                while len(in_flight) < 2 * workers and finished:
+                    root = next(roots, None)
+                    if root is None:
+                        break
+                    in_flight.add(executor.submit(search_root, root, best["score"], deadline))
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    score, found, visited, complete = future.result()
+                    nodes += visited
+                    finished &= complete
+                    if found is not None and score > best["score"]:
+                        best = pool.describe(found, penalty)
+                        yield dict(best, nodes=nodes, elapsed=time.time() - started, optimal=False, done=False)
+
+    yield dict(best, nodes=nodes, elapsed=time.time() - started, optimal=finished, done=True)
+
+
+def best_team(gen, k=MAX_TEAM_SIZE, time_budget=60.0, on_improvement=None, **kwargs):
+    """
+    Runs search_teams() to the end and returns its final result, calling
+    on_improvement(result) for every better team found along the way.
+    """
+    for result in search_teams(gen, k, time_budget, **kwargs):
+        if result["done"]:
+            return result
+        if on_improvement is not None:
+            on_improvement(result)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find the team of type combos with the best coverage and fewest shared weaknesses.")
+    parser.add_argument("generation", choices=list(GENERATIONS))
+    parser.add_argument("-k", type=int, default=MAX_TEAM_SIZE, help=f"Team size, 1 to {MAX_TEAM_SIZE} (default: {MAX_TEAM_SIZE}).")
+    parser.add_argument("--time", type=float, default=60.0, help="Time budget in seconds (default: 60).")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: one per CPU).")
+    parser.add_argument("--arities", type=int, nargs="+", default=[1, 2, 3], choices=[1, 2, 3],
+                        help="Combo sizes to pick from (default: 1 2 3).")
+    parser.add_argument("--penalty", type=float, default=SHARED_WEAKNESS_PENALTY,
+                        help=f"Points lost per shared weakness (default: {SHARED_WEAKNESS_PENALTY}).")
+    args = parser.parse_args(argv)
+    if not 1 <= args.k <= MAX_TEAM_SIZE:
+        parser.error(f"-k must be between 1 and {MAX_TEAM_SIZE}.")
+    if args.penalty < 0:
+        parser.error("--penalty can't be negative.")
+
+    for result in search_teams(args.generation, args.k, args.time, args.jobs, tuple(args.arities), args.penalty):
+        status = ("optimal" if result["optimal"] else "time budget reached") if result["done"] else "best so far"
+        print(f"[{result['elapsed']:6.1f}s] {status}: score {result['score']:g} "
+              f"(offence {result['offensive_score']:g}, {result['shared_weaknesses']} shared weaknesses) "
+              f"{', '.join(result['team'])}", flush=True)
+    print(f"Covers: {', '.join(result['coverage']) or '-'}")
+    print(f"Weak to: {', '.join(result['weak_to']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Leveled tracing and stage timers for the build scripts
+# Trace output goes through the standard logging module under the "pkm"
+# logger and is off unless PKM_TRACE (or configure()) turns it on. Messages
+# take lazy %-style arguments, so a disabled trace call is a level check and
+# nothing is formatted; per-target loops check isEnabledFor() once up front
+# and skip their calls entirely.
+#
+#   PKM_TRACE=debug python build/pkm-def.py    # every scoring step
+#   PKM_TRACE=info python build/pkmbuild.py    # per-stage build timings
+import logging
+import os
+import time
+import warnings
+from contextlib import contextmanager
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "off": logging.CRITICAL + 1,
+}
+
+_root = logging.getLogger("pkm")
+
+
+def get_tracer(name):
+    """Logger for one script, e.g. get_tracer("def") -> "pkm.def"."""
+    return _root.getChild(name)
+
+
+def configure(level=None):
+    """
+    Sets the trace level: one of LEVELS or a logging level number, defaulting
+    to the PKM_TRACE environment variable and otherwise "off". An unknown
+    PKM_TRACE value warns and falls back to "off" (this runs on import, so a
+    typo mustn't stop the build); an unknown `level` raises ValueError.
+    Returns the numeric level.
+    """
+    if level is None:
+        level = os.environ.get("PKM_TRACE", "off")
+        if level.lower() not in LEVELS:
+            warnings.warn(f"Ignoring unknown PKM_TRACE level '{level}'; tracing is off. Available: {list(LEVELS)}")
+            level = "off"
+    if isinstance(level, str):
+        if level.lower() not in LEVELS:
+            raise ValueError(f"Unknown trace level '{level}'. Available: {list(LEVELS)}")
+        level = LEVELS[level.lower()]
+    _root.setLevel(level)
+    if not _root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+        _root.addHandler(handler)
+        _root.propagate = False
+    return level
+
+
+def current_level():
+    return _root.level
+
+
+class StageTimer:
+    """
+    Wall-clock time per named stage of a job. Repeated stages accumulate;
+    each run is traced at DEBUG as it finishes and report() traces the
+    totals at INFO.
+    """
+
+    def __init__(self, label, tracer=None):
+        self.label = label
+        self.stages = {}
+        self._tracer = tracer or get_tracer("timing")
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+            self._tracer.debug("%s: %s took %.1f ms", self.label, name, elapsed * 1000)
+
+    def total(self):
+        return sum(self.stages.values())
+
+    def summary(self):
+        """One line with every stage's total, e.g. 'GEN9: chart load 3.1 ms, scoring 40.2 ms'."""
+        stages = ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in self.stages.items())
+        return f"{self.label}: {stages} (total {self.total() * 1000:.1f} ms)"
+
+    def report(self):
+        self._tracer.info("%s", self.summary())
+
+
+configure()
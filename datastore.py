@@ -0,0 +1,167 @@
+# Process-wide cache of the prepared ranking tables for the visualiser
+# Every generation is loaded and prepared once, handed out to Dash callbacks
+# as cheap views, and only reloaded when one of its source CSVs changes on disk.
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.join(base_path, "build"))
+
+import pkmbuild
+from pkmbuild import TIERS, generation_suffix, matchup_path, tier_path
+from pkmh2h import MatchupMatrix
+
+GENERATIONS = list(pkmbuild.GENERATIONS)
+SCORE_COLUMNS = ["Total Score", "Defensive Score", "Offensive Score"]
+TYPE_COLUMNS = ["First Type", "Second Type", "Third Type"]
+
+# Views handed to callbacks share memory with the cache; copy-on-write keeps
+# any edit a callback makes local to its own view. Pandas has no per-frame
+# switch, so on pandas < 3 this turns copy-on-write on for the whole process:
+# every DataFrame in anything that imports datastore (the visualiser, the
+# score API, benchmark.py) gets it, not just the cached tables. Pandas 3 always
+# behaves this way.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def generation_files(gen):
+    """Paths of the mono, dual and triple CSVs for a generation."""
+    return [tier_path(base_path, arity, generation_suffix(gen)) for arity in TIERS]
+
+
+def load_generation_data(gen):
+    mono_file, dual_file, triple_file = generation_files(gen)
+
+    mono = pd.read_csv(mono_file)
+    dual = pd.read_csv(dual_file)
+    triple = pd.read_csv(triple_file)
+
+    # Add Combined Type columns
+    dual["Combined Type"] = dual["First Type"].astype(str) + "/" + dual["Second Type"].astype(str)
+    triple["Combined Type"] = (triple["First Type"].astype(str) + "/" + triple["Second Type"].astype(str)
+                               + "/" + triple["Third Type"].astype(str))
+
+    # Add Head-to-Head Wins (combos of any tier each one beats) once the
+    # generation's matchup matrix has been built
+    if os.path.exists(matchup_path(gen)):
+        matchups = MatchupMatrix(matchup_path(gen))
+        wins = matchups.win_counts()
+        for arity, df in enumerate([mono, dual, triple], start=1):
+            ids = np.column_stack([df[col].map(matchups.type_ids).to_numpy(dtype=np.intp)
+                                   for col in TYPE_COLUMNS[:arity]])
+            df["Head-to-Head Wins"] = wins[matchups.indices(ids)]
+
+    # Add Rank column based on Total Score
+    for df in [mono, dual, triple]:
+        df["Rank"] = df["Total Score"].rank(ascending=False, method="min").astype(int)
+        df.sort_values("Rank", inplace=True)
+
+    # Reorder Rank to be first column
+    def move_rank_first(df):
+        cols = list(df.columns)
+        if "Rank" in cols:
+            cols.insert(0, cols.pop(cols.index("Rank")))
+            return df[cols]
+        return df
+
+    mono = move_rank_first(mono)
+    dual = move_rank_first(dual)
+    triple = move_rank_first(triple)
+
+    # Normalise key scores
+    scaler = MinMaxScaler()
+    for col in SCORE_COLUMNS:
+        mono[f"Normalised {col}"] = scaler.fit_transform(mono[[col]]).round(4)
+        dual[f"Normalised {col}"] = scaler.fit_transform(dual[[col]]).round(4)
+        triple[f"Normalised {col}"] = scaler.fit_transform(triple[[col]]).round(4)
+
+    return mono, dual, triple
+
+
+class DatasetStore:
+    """
+    Thread-safe cache of load_generation_data() results keyed by generation.
+
+    get() checks the source CSVs' and matchup matrix's modification times
+    (a stat per file, no parsing) and reloads a generation only when one
+    has changed. version() is derived from those modification times, so it
+    changes with every reload and agrees between server processes; callers
+    can use it to key their own caches. hits counts get() calls served from the cache
+    (version(), derived() and preload() don't count); misses counts
+    (re)loads, whichever call triggered them.
+    """
+
+    def __init__(self, loader=load_generation_data):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._derived = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _mtimes(gen):
+        mtimes = tuple(os.stat(path).st_mtime_ns for path in generation_files(gen))
+        if os.path.exists(matchup_path(gen)):
+            mtimes += (os.stat(matchup_path(gen)).st_mtime_ns,)
+        return mtimes
+
+    def _entry(self, gen, count=False):
+        mtimes = self._mtimes(gen)
+        with self._lock:
+            entry = self._entries.get(gen)
+            if entry is not None and entry[0] == mtimes:
+                if count:
+                    self.hits += 1
+                return entry
+            self.misses += 1
+            frames = tuple(self._loader(gen))
+            entry = (mtimes, frames, format(hash(mtimes) & 0xFFFFFFFFFFFF, "012x"))
+            self._entries[gen] = entry
+            return entry
+
+    def get(self, gen):
+        """Returns read-only (mono, dual, triple) views of a generation's tables."""
+        _, frames, _ = self._entry(gen, count=True)
+        return tuple(df.copy(deep=False) for df in frames)
+
+    def version(self, gen):
+        """Version of the cached data for a generation; changes whenever it reloads."""
+        _, _, version = self._entry(gen)
+        return version
+
+    def derived(self, gen, name, build, depends_on=None):
+        """
+        Cached build(mono, dual, triple) result for a generation, rebuilt
+        only when the generation reloads or `depends_on` changes (e.g. the
+        modification time of another file build reads). Used for indexes
+        built on top of the tables; one result is kept per name, so a
+        rebuild replaces the old one.
+        """
+        _, frames, version = self._entry(gen)
+        key = (gen, name)
+        stamp = (version, depends_on)
+        with self._lock:
+            cached = self._derived.get(key)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+        value = build(*frames)
+        with self._lock:
+            self._derived[key] = (stamp, value)
+        return value
+
+    def preload(self, generations=GENERATIONS):
+        for gen in generations:
+            self._entry(gen)
+
+    def stats(self):
+        with self._lock:
+            versions = {gen: entry[2] for gen, entry in self._entries.items()}
+            return {"hits": self.hits, "misses": self.misses, "versions": versions}
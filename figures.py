@@ -0,0 +1,125 @@
+# Ranking bar charts and a cache of their serialised figures
+# A chart only depends on (tier, generation, score column, render mode) and the
+# dataset version, so each one is built once, kept as plain figure JSON and
+# handed straight back to Dash until the generation's data reloads.
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.express as px
+
+TIERS = {
+    "single": {"frame": 0, "x": "First Type", "x_label": "Type", "title": "Single-Type Rankings"},
+    "dual": {"frame": 1, "x": "Combined Type", "x_label": "Type Combination", "title": "Dual-Type Rankings"},
+    "triple": {"frame": 2, "x": "Combined Type", "x_label": "Type Combination", "title": "Triple-Type Rankings"},
+}
+SCORE_OPTIONS = ["Normalised Total Score", "Normalised Defensive Score", "Normalised Offensive Score"]
+# bar: one bar per combo (default); webgl: one WebGL marker per combo, much
+# lighter for the browser on large tiers; aggregated: histogram of the scores
+RENDER_MODES = ["bar", "webgl", "aggregated"]
+
+
+def build_figure(tier, gen, frame, selected_score, render_mode="bar"):
+    spec = TIERS[tier]
+    x = spec["x"]
+    if selected_score not in frame.columns:
+        return px.bar(title="Invalid Selection", labels={x: spec["x_label"]})
+    if tier != "single":
+        frame = frame.dropna(subset=[selected_score, x])
+        if frame.empty:
+            return px.bar(title="No Data Available", labels={x: spec["x_label"]})
+    frame["Score Type"] = np.where(frame[selected_score] >= 0.5, 'Positive', 'Negative')
+
+    title = f"{spec['title']} – {gen}"
+    labels = {x: spec["x_label"], selected_score: selected_score}
+    if render_mode == "aggregated":
+        return px.histogram(
+            frame,
+            x=selected_score,
+            color="Score Type",
+            nbins=40,
+            title=title,
+            labels=labels
+        ).update_layout(
+            yaxis_title="Combinations",
+            bargap=0.2
+        )
+    if render_mode == "webgl":
+        figure = px.scatter(
+            frame,
+            x=x,
+            y=selected_score,
+            color="Score Type",
+            title=title,
+            labels=labels,
+            render_mode="webgl"
+        )
+    else:
+        figure = px.bar(
+            frame,
+            x=x,
+            y=selected_score,
+            color="Score Type",
+            title=title,
+            labels=labels
+        )
+    return figure.update_layout(
+        xaxis={'categoryorder': 'total ascending'},
+        yaxis=dict(range=[0, 1.2]),
+        bargap=0.2
+    )
+
+
+class FigureCache:
+    """
+    Bounded LRU of serialised figures keyed by (tier, generation, score
+    column, render mode, dataset version). A dataset reload changes the
+    version, so stale figures are never served and are dropped on the next
+    request for that chart.
+    """
+
+    def __init__(self, store, maxsize=64):
+        self._store = store
+        self._maxsize = maxsize
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tier, gen, selected_score, render_mode="bar"):
+        if selected_score not in SCORE_OPTIONS or render_mode not in RENDER_MODES:
+            frame = self._store.get(gen)[TIERS[tier]["frame"]]
+            return build_figure(tier, gen, frame, selected_score, render_mode)
+
+        version = self._store.version(gen)
+        key = (tier, gen, selected_score, render_mode, version)
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return figure
+            self.misses += 1
+
+        frame = self._store.get(gen)[TIERS[tier]["frame"]]
+        figure = json.loads(build_figure(tier, gen, frame, selected_score, render_mode).to_json())
+
+        with self._lock:
+            for stale in [k for k in self._figures if k[:4] == key[:4] and k[4] != version]:
+                del self._figures[stale]
+            self._figures[key] = figure
+            while len(self._figures) > self._maxsize:
+                self._figures.popitem(last=False)
+        return figure
+
+    def preload(self, generations, render_mode="bar"):
+        """Builds every tier and score column for the given generations up front."""
+        for gen in generations:
+            for tier in TIERS:
+                for selected_score in SCORE_OPTIONS:
+                    self.get(tier, gen, selected_score, render_mode)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._figures)}
@@ -0,0 +1,142 @@
+# Request and callback metrics for the visualiser, served from /metrics
+# Counts every HTTP request by route, method and status, and keeps latency
+# histograms per route and per Dash callback, in the Prometheus text format so
+# any scraper (or curl) can read them.
+import bisect
+import functools
+import threading
+import time
+
+from flask import Response, g, request
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Counts of observations per latency bucket, plus their sum and total count."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self):
+        """(upper bound, observations at or below it) per bucket, ending with +Inf."""
+        total = 0
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            yield bound, total
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class Metrics:
+    """
+    Thread-safe request counts and latency histograms for one server.
+    register() hooks it into a Flask app and adds the /metrics route;
+    timed() wraps a Dash callback so each call lands in its histogram.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._request_latency = {}
+        self._callback_latency = {}
+        self._callback_errors = {}
+
+    def observe_request(self, route, method, status, seconds):
+        with self._lock:
+            key = (route, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._request_latency.setdefault(route, Histogram(self._buckets)).observe(seconds)
+
+    def observe_callback(self, name, seconds, failed=False):
+        with self._lock:
+            self._callback_latency.setdefault(name, Histogram(self._buckets)).observe(seconds)
+            if failed:
+                self._callback_errors[name] = self._callback_errors.get(name, 0) + 1
+
+    def timed(self, name=None):
+        """Decorator recording the latency (and any exception) of every call under `name` (default: function name)."""
+        def decorator(func):
+            callback_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                failed = True
+                try:
+                    result = func(*args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    self.observe_callback(callback_name, time.perf_counter() - started, failed)
+            return wrapper
+        return decorator
+
+    def register(self, server, path="/metrics"):
+        """Times every request to a Flask server and serves the metrics at `path`."""
+
+        @server.before_request
+        def start_timer():
+            g.metrics_started = time.perf_counter()
+
+        @server.after_request
+        def record_request(response):
+            started = g.pop("metrics_started", None)
+            if started is not None:
+                # Label by route pattern rather than raw path to keep the series bounded
+                route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+                self.observe_request(route, request.method, response.status_code, time.perf_counter() - started)
+            return response
+
+        @server.route(path)
+        def metrics():
+            return Response(self.render(), content_type=CONTENT_TYPE)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            lines = [
+                "# HELP pkm_http_requests_total HTTP requests handled, by route, method and status.",
+                "# TYPE pkm_http_requests_total counter",
+            ]
+            for (route, method, status), count in sorted(self._requests.items()):
+                lines.append(f"pkm_http_requests_total{_labels(route=route, method=method, status=status)} {count}")
+            lines += self._histogram_lines("pkm_http_request_duration_seconds", "HTTP request latency, by route.",
+                                           "route", self._request_latency)
+            lines += self._histogram_lines("pkm_callback_duration_seconds", "Dash callback latency, by callback.",
+                                           "callback", self._callback_latency)
+            lines += [
+                "# HELP pkm_callback_errors_total Dash callback calls that raised, by callback.",
+                "# TYPE pkm_callback_errors_total counter",
+            ]
+            for name, count in sorted(self._callback_errors.items()):
+                lines.append(f"pkm_callback_errors_total{_labels(callback=name)} {count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _histogram_lines(metric, description, label, histograms):
+        lines = [f"# HELP {metric} {description}", f"# TYPE {metric} histogram"]
+        for key, histogram in sorted(histograms.items()):
+            for bound, count in histogram.cumulative():
+                lines.append(f"{metric}_bucket{_labels(**{label: key, 'le': bound})} {count}")
+            lines.append(f"{metric}_sum{_labels(**{label: key})} {histogram.sum}")
+            lines.append(f"{metric}_count{_labels(**{label: key})} {histogram.count}")
+        return lines
@@ -0,0 +1,157 @@
+# JSON scoring API served next to the Dash app
+#   POST /api/scores                       batch of combos for one generation
+#   GET  /api/scores/<generation>/<combo>  one combo, e.g. /api/scores/GEN9/Fire/Water
+# Scores and ranks come from the cached ranking tables and matchup breakdowns
+# from the packed score artifact, both laid out by combo rank so a whole batch
+# is answered with one gather per tier.
+import os
+import sys
+
+import numpy as np
+from flask import jsonify, request
+
+from datastore import GENERATIONS, base_path
+
+sys.path.insert(0, os.path.join(base_path, "build"))
+
+from pkmbuild import artifact_path
+from pkmengine import analysis_view
+from pkmscore import ScoreArtifact
+
+TYPE_COLUMNS = ["First Type", "Second Type", "Third Type"]
+MAX_BATCH = 10000
+CACHE_MAX_AGE = 300
+
+
+class ScoreLookup:
+    """
+    Per-generation score arrays aligned with the artifact's combo rows, so a
+    combo's scores, rank and multipliers all sit at artifact.index(type_ids).
+    """
+
+    def __init__(self, artifact, mono, dual, triple):
+        self.artifact = artifact
+        n_rows = artifact.blocks.shape[0]
+        self.defensive = np.full(n_rows, np.nan)
+        self.offensive = np.full(n_rows, np.nan)
+        self.total = np.full(n_rows, np.nan)
+        self.rank = np.zeros(n_rows, dtype=np.int64)
+        self.tier_size = np.zeros(n_rows, dtype=np.int64)
+        self.wins = np.full(n_rows, -1, dtype=np.int64)
+        self.types = [None] * n_rows
+        self.names = [None] * n_rows
+        # Matchup breakdowns are built the first time each combo is asked for
+        self._matchups = [None] * n_rows
+        for arity, frame in enumerate((mono, dual, triple), start=1):
+            ids = np.column_stack([frame[col].map(artifact.type_ids).to_numpy(dtype=np.intp)
+                                   for col in TYPE_COLUMNS[:arity]])
+            rows = artifact.indices(ids)
+            for row, combo_ids in zip(rows.tolist(), np.sort(ids, axis=1).tolist()):
+                self.types[row] = [artifact.type_names[t] for t in combo_ids]
+                self.names[row] = '/'.join(self.types[row])
+            self.defensive[rows] = frame["Defensive Score"].to_numpy()
+            self.offensive[rows] = frame["Offensive Score"].to_numpy()
+            self.total[rows] = frame["Total Score"].to_numpy()
+            self.rank[rows] = frame["Rank"].to_numpy()
+            self.tier_size[rows] = len(frame)
+            if "Head-to-Head Wins" in frame.columns:
+                self.wins[rows] = frame["Head-to-Head Wins"].to_numpy()
+
+    def parse(self, combo):
+        """Type ids for a combo given as 'Fire/Water' or ['Fire', 'Water']."""
+        type_names = combo.split('/') if isinstance(combo, str) else combo
+        if not isinstance(type_names, list) or not 1 <= len(type_names) <= 3:
+            raise ValueError("A combo must be 1 to 3 type names, e.g. 'Fire/Water'.")
+        ids = self.artifact.ids_for(type_names)
+        if len(set(ids)) != len(ids):
+            raise ValueError("A combo can't repeat a type.")
+        return sorted(ids)
+
+    def score(self, combos, matchups=True):
+        """Results for a list of combos, in request order; invalid combos get an 'error' entry."""
+        results = [None] * len(combos)
+        by_arity = {}
+        for position, combo in enumerate(combos):
+            try:
+                ids = self.parse(combo)
+            except (KeyError, TypeError, ValueError) as e:
+                results[position] = {"combo": combo, "error": str(e.args[0] if e.args else e)}
+                continue
+            by_arity.setdefault(len(ids), ([], []))
+            by_arity[len(ids)][0].append(position)
+            by_arity[len(ids)][1].append(ids)
+
+        type_names = self.artifact.type_names
+        for positions, ids in by_arity.values():
+            rows = self.artifact.indices(np.array(ids, dtype=np.intp))
+            columns = zip(rows.tolist(), self.defensive[rows].tolist(), self.offensive[rows].tolist(),
+                          self.total[rows].tolist(), self.rank[rows].tolist(), self.tier_size[rows].tolist(),
+                          self.wins[rows].tolist())
+            for i, (row, defensive, offensive, total, rank, tier_size, wins) in enumerate(columns):
+                result = {
+                    "combo": self.names[row],
+                    "types": self.types[row],
+                    "defensive_score": defensive,
+                    "offensive_score": offensive,
+                    "total_score": total,
+                    "rank": rank,
+                    "tier_size": tier_size,
+                }
+                if wins >= 0:
+                    result["head_to_head_wins"] = wins
+                if matchups:
+                    if self._matchups[row] is None:
+                        block = np.asarray(self.artifact.blocks[row], dtype=np.float64)
+                        self._matchups[row] = analysis_view(type_names, block[0], block[1])
+                    result["matchups"] = self._matchups[row]
+                results[positions[i]] = result
+        return results
+
+
+def data_version(store, gen):
+    """Changes whenever the ranking CSVs or the generation's artifact change."""
+    return f"{store.version(gen)}-{os.stat(artifact_path(gen)).st_mtime_ns:x}"
+
+
+def score_lookup(store, gen):
+    # Keyed on the artifact's modification time too, so a rebuilt artifact
+    # replaces the cached lookup
+    artifact_mtime = os.stat(artifact_path(gen)).st_mtime_ns
+    return store.derived(gen, "score-api", lambda *frames: ScoreLookup(ScoreArtifact(artifact_path(gen)), *frames),
+                         depends_on=artifact_mtime)
+
+
+def error(message, status=400):
+    return jsonify({"error": message}), status
+
+
+def register_api(server, store):
+    """Adds the scoring endpoints to the Flask server behind the Dash app."""
+
+    @server.route('/api/scores', methods=['POST'])
+    def score_batch():
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict) or not isinstance(body.get("combos"), list):
+            return error("Expected a JSON body like {\"generation\": \"GEN9\", \"combos\": [\"Fire/Water\", ...]}.")
+        gen = body.get("generation", "GEN9")
+        if gen not in GENERATIONS:
+            return error(f"Unknown generation '{gen}'. Available: {GENERATIONS}")
+        if len(body["combos"]) > MAX_BATCH:
+            return error(f"At most {MAX_BATCH} combos per request.", 413)
+
+        results = score_lookup(store, gen).score(body["combos"], matchups=body.get("matchups", True))
+        return jsonify({"generation": gen, "version": data_version(store, gen), "results": results})
+
+    @server.route('/api/scores/<generation>/<path:combo>', methods=['GET'])
+    def score_single(generation, combo):
+        if generation not in GENERATIONS:
+            return error(f"Unknown generation '{generation}'. Available: {GENERATIONS}", 404)
+        result = score_lookup(store, generation).score([combo])[0]
+        if "error" in result:
+            return error(result["error"], 404)
+
+        response = jsonify({"generation": generation, "version": data_version(store, generation), **result})
+        response.set_etag(data_version(store, generation))
+        response.cache_control.public = True
+        response.cache_control.max_age = CACHE_MAX_AGE
+        return response.make_conditional(request)
@@ -0,0 +1,301 @@
+# Behaviour checks for the visualiser's server side
+# Exercises the code behind the Dash app without a browser and checks that:
+#   - TableIndex pages, searches and sorts like the DataTable expects, with
+#     tied rows in table order both ways
+#   - the dual / triple table callbacks start from the first page on a new
+#     search and only keep page_current when the table's pager fired them
+#   - DatasetStore reloads a generation when a source file's modification
+#     time changes, counts only get() calls as hits, and keeps one derived
+#     result per name
+#   - FigureCache serves cached figures until the data reloads, then
+#     replaces them
+#   - /api/scores answers bad requests with the right error statuses, scores
+#     match the ranking CSVs, single-combo responses revalidate with their
+#     ETag, and a rebuilt artifact replaces the cached lookup
+#   - /metrics counts requests by route pattern and records callback
+#     latencies and errors in the Prometheus text format
+# Exits with status 1 if any check fails. Like build/pkmcheck.py, nothing on
+# disk is changed; checks that need a reload bump a file's modification time
+# and put it back.
+#
+# Usage: python servecheck.py
+import os
+import sys
+from contextlib import contextmanager
+
+import pandas as pd
+from flask import Flask
+
+from datastore import DatasetStore, generation_files, load_generation_data
+from figures import FigureCache
+from metrics import CONTENT_TYPE, Metrics
+from pkmbuild import artifact_path
+from scoreapi import MAX_BATCH, register_api
+from tableindex import TableIndex
+
+SCORE = "Normalised Total Score"
+
+
+@contextmanager
+def touched(path):
+    """Moves a file's modification time a second forward, restoring it afterwards."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    try:
+        yield
+    finally:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def check_table_index():
+    """Paging, clamping, search and stable sorting of a TableIndex."""
+    problems = []
+    first = ["Fire", "Water", "Grass", "Fire", "Ice"] * 9
+    second = ["Water", "Grass", "Fire", "Ice", "Rock"] * 9
+    scores = [1.0, 2.0, 1.0, 3.0, 2.0] * 9
+    df = pd.DataFrame({"First Type": first, "Second Type": second, "Total Score": scores})
+    index = TableIndex(df, ["First Type", "Second Type"])
+
+    records, page_count, page_current = index.page(None, 2, 20)
+    if (len(records), page_count, page_current) != (5, 3, 2):
+        problems.append(f"last page of 45 rows: got {len(records)} rows, page {page_current} of {page_count}")
+    if records[0] != df.iloc[40].to_dict():
+        problems.append("unsorted, unfiltered pages aren't in table order")
+    _, _, page_current = index.page(None, 30, 20)
+    if page_current != 2:
+        problems.append(f"page 30 of 3 was clamped to {page_current}, not the last page")
+
+    fire_rows = [row for row in range(len(df)) if "Fire" in (first[row], second[row])]
+    for query in ("fire", " FIRE ", "ir"):
+        records, _, _ = index.page(query, 0, 100)
+        if records != [df.iloc[row].to_dict() for row in fire_rows]:
+            problems.append(f"search {query!r} didn't return exactly the rows with Fire, in table order")
+    records, page_count, _ = index.page("dragon", 0, 20)
+    if records or page_count != 1:
+        problems.append(f"a search with no matches gave {len(records)} rows and {page_count} pages")
+
+    for direction in ("asc", "desc"):
+        records, _, _ = index.page(None, 0, 100, [{"column_id": "Total Score", "direction": direction}])
+        expected = sorted(range(len(df)), key=lambda row: -scores[row] if direction == "desc" else scores[row])
+        if records != [df.iloc[row].to_dict() for row in expected]:
+            problems.append(f"{direction} sort isn't stable: tied rows aren't in table order")
+    records, _, _ = index.page(None, 0, 5, [{"column_id": "Missing", "direction": "asc"}])
+    if records != df.iloc[:5].to_dict("records"):
+        problems.append("sorting by an unknown column didn't fall back to table order")
+    return problems
+
+
+def table_callback(client, table, search_query, page_current, changed):
+    """Calls a table callback through Dash's endpoint. Returns (page_current, page_count)."""
+    inputs = [{"id": "generation-dropdown", "property": "value", "value": "GEN9"},
+              {"id": f"{table}-search", "property": "value", "value": search_query},
+              {"id": f"{table}-table", "property": "page_current", "value": page_current},
+              {"id": f"{table}-table", "property": "page_size", "value": 20},
+              {"id": f"{table}-table", "property": "sort_by", "value": []}]
+    outputs = [{"id": f"{table}-table", "property": prop} for prop in ("data", "columns", "page_count", "page_current")]
+    response = client.post("/_dash-update-component", json={
+        "output": "...".join(f"{output['id']}.{output['property']}" for output in outputs).join(["..", ".."]),
+        "outputs": outputs,
+        "inputs": inputs,
+        "changedPropIds": [changed],
+        "state": [],
+    })
+    result = response.get_json()["response"][f"{table}-table"]
+    return result["page_current"], result["page_count"]
+
+
+def check_table_paging():
+    """A new search starts from the first page; turning the page keeps it (clamped to the last)."""
+    import visualise
+
+    client = visualise.app.server.test_client()
+    problems = []
+    # Searches with more than four pages of matches, so page 3 exists
+    for table, query in (("dual-type", "r"), ("triple-type", "fire")):
+        page_current, page_count = table_callback(client, table, query, 3, f"{table}-search.value")
+        if page_count <= 3 or page_current != 0:
+            problems.append(f"{table}: typing {query!r} on page 3 showed page {page_current} of {page_count}, "
+                            "not the first")
+        page_current, _ = table_callback(client, table, query, 3, f"{table}-table.page_current")
+        if page_current != 3:
+            problems.append(f"{table}: turning to page 3 showed page {page_current}")
+        page_current, page_count = table_callback(client, table, query, 30, f"{table}-table.page_current")
+        if page_current != page_count - 1:
+            problems.append(f"{table}: page 30 of {page_count} showed page {page_current}, not the last")
+    return problems
+
+
+def check_dataset_store():
+    """Reloads on a modification time change, hit counting and derived results."""
+    problems = []
+    store = DatasetStore()
+    builds = []
+
+    def build(mono, dual, triple):
+        builds.append(len(dual))
+        return len(dual)
+
+    mono, _, _ = store.get("GEN1")
+    store.get("GEN1")
+    version = store.version("GEN1")
+    store.derived("GEN1", "check", build)
+    store.derived("GEN1", "check", build)
+    if (store.hits, store.misses) != (1, 1):
+        problems.append(f"two get()s plus version() and derived() calls counted {store.hits} hits, "
+                        f"{store.misses} misses; expected 1 and 1")
+    if len(builds) != 1:
+        problems.append(f"derived() built {len(builds)} times for unchanged data")
+
+    mono.loc[mono.index[0], "Total Score"] = -1.0
+    if store.get("GEN1")[0]["Total Score"].iloc[0] == -1.0:
+        problems.append("editing a frame from get() changed the cached table")
+
+    with touched(generation_files("GEN1")[1]):
+        store.get("GEN1")
+        if store.misses != 2 or store.version("GEN1") == version:
+            problems.append("a newer CSV modification time didn't reload the generation")
+        store.derived("GEN1", "check", build)
+        if len(builds) != 2:
+            problems.append("derived() wasn't rebuilt after a reload")
+    if store.version("GEN1") != version:
+        problems.append("restoring the modification time didn't bring back the original version")
+    derived_names = [key for key in store._derived if key[0] == "GEN1"]
+    if derived_names != [("GEN1", "check")]:
+        problems.append(f"derived() kept {derived_names} instead of one entry per name")
+    return problems
+
+
+def check_figure_cache():
+    """Cached figures are reused until the generation reloads, then replaced."""
+    problems = []
+    store = DatasetStore()
+    cache = FigureCache(store)
+    figure = cache.get("dual", "GEN1", SCORE)
+    if cache.get("dual", "GEN1", SCORE) is not figure or (cache.hits, cache.misses) != (1, 1):
+        problems.append(f"a repeated request wasn't served from the cache ({cache.stats()})")
+    cache.get("dual", "GEN1", "Not A Score")
+    if cache.stats()["size"] != 1:
+        problems.append("an invalid score column was cached")
+
+    with touched(generation_files("GEN1")[1]):
+        if cache.get("dual", "GEN1", SCORE) is figure or cache.misses != 2:
+            problems.append("a reload still served the old figure")
+        if cache.stats()["size"] != 1:
+            problems.append(f"the stale figure wasn't dropped after a reload ({cache.stats()})")
+    return problems
+
+
+def check_score_api():
+    """Error statuses, scores, ETag revalidation and artifact reloads of the scoring API."""
+    problems = []
+    store = DatasetStore()
+    server = Flask(__name__)
+    register_api(server, store)
+    client = server.test_client()
+
+    bad_requests = [
+        ("no JSON body", client.post("/api/scores", data="not json"), 400),
+        ("combos not a list", client.post("/api/scores", json={"combos": "Fire/Water"}), 400),
+        ("unknown generation", client.post("/api/scores", json={"generation": "GEN0", "combos": []}), 400),
+        ("oversized batch", client.post("/api/scores", json={"combos": ["Fire"] * (MAX_BATCH + 1)}), 413),
+        ("GET unknown generation", client.get("/api/scores/GEN0/Fire"), 404),
+        ("GET unknown type", client.get("/api/scores/GEN1/Fire/Nope"), 404),
+        ("GET repeated type", client.get("/api/scores/GEN1/Fire/Fire"), 404),
+    ]
+    for name, response, status in bad_requests:
+        if response.status_code != status or "error" not in response.get_json():
+            problems.append(f"{name}: got {response.status_code}, expected {status} with an error message")
+
+    response = client.post("/api/scores", json={"generation": "GEN1", "combos": ["Fire/Water", "Fire/Nope",
+                                                                                  ["Water", "Fire"]]})
+    results = response.get_json()["results"]
+    _, dual, _ = load_generation_data("GEN1")
+    row = dual[(dual["First Type"] == "Fire") & (dual["Second Type"] == "Water")].iloc[0]
+    expected = {"defensive_score": row["Defensive Score"], "offensive_score": row["Offensive Score"],
+                "total_score": row["Total Score"], "rank": row["Rank"]}
+    if response.status_code != 200 or len(results) != 3 or "error" not in results[1]:
+        problems.append("a batch with one bad combo didn't return every result in order with an error for it")
+    elif any(results[i][key] != value for i in (0, 2) for key, value in expected.items()):
+        problems.append(f"Fire/Water scored {results[0]}, the ranking CSV says {expected}")
+
+    response = client.get("/api/scores/GEN1/Water/Fire")
+    etag, _ = response.get_etag()
+    if response.status_code != 200 or not etag or response.cache_control.max_age is None:
+        problems.append(f"a single combo came back {response.status_code} without an ETag and max-age")
+    elif client.get("/api/scores/GEN1/Water/Fire", headers={"If-None-Match": f'"{etag}"'}).status_code != 304:
+        problems.append("a request with the current ETag wasn't answered 304 Not Modified")
+
+    with touched(artifact_path("GEN1")):
+        response = client.get("/api/scores/GEN1/Water/Fire", headers={"If-None-Match": f'"{etag}"'})
+        if response.status_code != 200 or response.get_etag()[0] == etag:
+            problems.append("a rebuilt artifact still revalidated against the old ETag")
+    lookups = [key for key in store._derived if key[0] == "GEN1"]
+    if lookups != [("GEN1", "score-api")]:
+        problems.append(f"the cached score lookups are {lookups}, expected one per generation")
+    return problems
+
+
+def check_metrics():
+    """Request counts, latency histograms and callback errors served at /metrics."""
+    problems = []
+    metrics = Metrics()
+    server = Flask(__name__)
+    metrics.register(server)
+
+    @server.route("/item/<name>")
+    def item(name):
+        return name
+
+    @metrics.timed("check_callback")
+    def callback(fail):
+        if fail:
+            raise RuntimeError("failed on purpose")
+        return "ok"
+
+    client = server.test_client()
+    for name in ("a", "b"):
+        client.get(f"/item/{name}")
+    client.get("/missing")
+    callback(False)
+    try:
+        callback(True)
+    except RuntimeError:
+        pass
+
+    response = client.get("/metrics")
+    lines = response.get_data(as_text=True).splitlines()
+    expected = [
+        'pkm_http_requests_total{route="/item/<name>",method="GET",status="200"} 2',
+        'pkm_http_requests_total{route="unmatched",method="GET",status="404"} 1',
+        'pkm_http_request_duration_seconds_count{route="/item/<name>"} 2',
+        'pkm_http_request_duration_seconds_bucket{route="/item/<name>",le="+Inf"} 2',
+        'pkm_callback_duration_seconds_count{callback="check_callback"} 2',
+        'pkm_callback_errors_total{callback="check_callback"} 1',
+    ]
+    if response.status_code != 200 or response.content_type != CONTENT_TYPE:
+        problems.append(f"/metrics answered {response.status_code} with content type {response.content_type}")
+    problems += [f"/metrics is missing: {line}" for line in expected if line not in lines]
+    return problems
+
+
+def main():
+    failed = 0
+    checks = [
+        ("table index", check_table_index),
+        ("table paging", check_table_paging),
+        ("dataset store", check_dataset_store),
+        ("figure cache", check_figure_cache),
+        ("score API", check_score_api),
+        ("metrics", check_metrics),
+    ]
+    for name, check in checks:
+        problems = check()
+        print(f"{name}: {'FAILED' if problems else 'ok'}")
+        for problem in problems:
+            print(f"  {problem}")
+        failed += bool(problems)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
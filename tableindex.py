@@ -0,0 +1,77 @@
+# Server-side paging, sorting and type search for the ranking tables
+# Built once per dataset version: every row pre-serialised for the DataTable,
+# an ascending and a descending ordering per column, and an inverted index from every
+# (lower-case) substring of a type name to the rows containing that type.
+import math
+
+import numpy as np
+
+
+class TableIndex:
+    """
+    Answers DataTable page requests for one prepared ranking table without
+    touching the DataFrame: a search is a dictionary lookup, sorting reuses a
+    precomputed ordering, and only the requested page's records are returned.
+    """
+
+    def __init__(self, df, type_columns):
+        self.columns = list(df.columns)
+        self.records = df.to_dict('records')
+        self.n_rows = len(self.records)
+
+        # Stable orderings per (column, direction): tied rows keep their table
+        # order either way. The descending one is a stable ascending sort of
+        # the reversed column, turned around and mapped back to row numbers.
+        self._orders = {}
+        for col in self.columns:
+            values = df[col].to_numpy()
+            self._orders[col, "asc"] = np.argsort(values, kind="stable")
+            self._orders[col, "desc"] = self.n_rows - 1 - np.argsort(values[::-1], kind="stable")[::-1]
+
+        # Type name -> rows that include it, then every substring of each name
+        # -> union of the rows of the names containing it
+        type_rows = {}
+        for col in type_columns:
+            for row, name in enumerate(df[col].astype(str).tolist()):
+                type_rows.setdefault(name, np.zeros(self.n_rows, dtype=bool))[row] = True
+        self._search = {}
+        for name, rows in type_rows.items():
+            lowered = name.lower()
+            substrings = {lowered[i:j] for i in range(len(lowered)) for j in range(i + 1, len(lowered) + 1)}
+            for substring in substrings:
+                if substring in self._search:
+                    self._search[substring] = self._search[substring] | rows
+                else:
+                    self._search[substring] = rows
+
+    def matches(self, search_query):
+        """Boolean row mask for a case-insensitive type search, or None for no filter."""
+        if not search_query:
+            return None
+        return self._search.get(search_query.strip().lower(), np.zeros(self.n_rows, dtype=bool))
+
+    def page(self, search_query=None, page_current=0, page_size=20, sort_by=None):
+        """
+        Returns (records, page_count, page_current) for the requested page,
+        clamping page_current to the last page when a search shrinks the table.
+        """
+        if sort_by:
+            order = self._orders.get((sort_by[0]["column_id"], sort_by[0]["direction"]))
+        else:
+            order = None
+
+        mask = self.matches(search_query)
+        if order is None:
+            rows = np.flatnonzero(mask) if mask is not None else None
+        else:
+            rows = order[mask[order]] if mask is not None else order
+        n_matches = self.n_rows if rows is None else len(rows)
+
+        page_count = max(1, math.ceil(n_matches / page_size))
+        page_current = min(page_current or 0, page_count - 1)
+        start = page_current * page_size
+        if rows is None:
+            page_rows = range(start, min(start + page_size, n_matches))
+        else:
+            page_rows = rows[start:start + page_size].tolist()
+        return [self.records[row] for row in page_rows], page_count, page_current
@@ -1,64 +1,43 @@
 import os
-import pandas as pd
-import plotly.express as px
 import dash
 from dash import dcc, html, dash_table
 from dash.dependencies import Input, Output
-from sklearn.preprocessing import MinMaxScaler
-
-def load_generation_data(gen):
-    base_path = os.path.dirname(os.path.abspath(__file__))
-
-    if gen == "GEN9":
-        mono_file = "monotype_combinations.csv"
-        dual_file = "dualtype_combinations.csv"
-        triple_file = "tripletype_combinations.csv"
-    else:
-        mono_file = f"monotype_combinations{gen}.csv"
-        dual_file = f"dualtype_combinations{gen}.csv"
-        triple_file = f"tripletype_combinations{gen}.csv"
-
-    mono = pd.read_csv(os.path.join(base_path, mono_file))
-    dual = pd.read_csv(os.path.join(base_path, dual_file))
-    triple = pd.read_csv(os.path.join(base_path, triple_file))
-
-    # Add Combined Type columns
-    dual["Combined Type"] = dual.apply(lambda row: '/'.join(filter(None, [str(row["First Type"]), str(row["Second Type"])])), axis=1)
-    triple["Combined Type"] = triple.apply(lambda row: '/'.join(filter(None, [str(row["First Type"]), str(row["Second Type"]), str(row["Third Type"])])), axis=1)
-
-    # Add Rank column based on Total Score
-    for df in [mono, dual, triple]:
-        df["Rank"] = df["Total Score"].rank(ascending=False, method="min").astype(int)
-        df.sort_values("Rank", inplace=True)
-
-    # Reorder Rank to be first column
-    def move_rank_first(df):
-        cols = list(df.columns)
-        if "Rank" in cols:
-            cols.insert(0, cols.pop(cols.index("Rank")))
-            return df[cols]
-        return df
-
-    mono = move_rank_first(mono)
-    dual = move_rank_first(dual)
-    triple = move_rank_first(triple)
-
-    # Normalise key scores
-    scaler = MinMaxScaler()
-    for col in ["Total Score", "Defensive Score", "Offensive Score"]:
-        mono[f"Normalised {col}"] = scaler.fit_transform(mono[[col]]).round(4)
-        dual[f"Normalised {col}"] = scaler.fit_transform(dual[[col]]).round(4)
-        triple[f"Normalised {col}"] = scaler.fit_transform(triple[[col]]).round(4)
-
-    return mono, dual, triple
+from dash.exceptions import MissingCallbackContextException
+from flask import jsonify
+from datastore import GENERATIONS, DatasetStore
+from figures import FigureCache
+from metrics import Metrics
+from scoreapi import register_api
+from tableindex import TableIndex
+
+# Every generation is loaded once at startup; callbacks get cached views and a
+# generation only reloads when its CSVs change on disk
+dataset_store = DatasetStore()
+dataset_store.preload()
+
+# Charts only change with the data, so they're built up front and served from
+# a cache of serialised figures keyed on the dataset version
+figure_cache = FigureCache(dataset_store)
+figure_cache.preload(GENERATIONS)
 
 # Initialise the Dash app
 app = dash.Dash(__name__)
 
+# Request counts and per-route / per-callback latency histograms at /metrics
+metrics = Metrics()
+metrics.register(app.server)
+
 @app.server.route('/healthz')
 def health_check():
     return "OK", 200
 
+@app.server.route('/healthz/datasets')
+def dataset_stats():
+    return jsonify(dataset_store.stats())
+
+# JSON scoring endpoints for programmatic access (see scoreapi.py)
+register_api(app.server, dataset_store)
+
 app.layout = html.Div([
     html.H1("Pokémon Type Rankings Viewer"),
 
@@ -94,7 +73,11 @@ dcc.Dropdown(
         id='dual-type-table',
         columns=[],
         data=[],
-        sort_action="native",
+        page_action="custom",
+        page_current=0,
+        sort_action="custom",
+        sort_mode="single",
+        sort_by=[],
         page_size=20,
         style_table={'overflowX': 'auto'},
     ),
@@ -109,7 +92,11 @@ dcc.Dropdown(
         id='triple-type-table',
         columns=[],
         data=[],
-        sort_action="native",
+        page_action="custom",
+        page_current=0,
+        sort_action="custom",
+        sort_mode="single",
+        sort_by=[],
         page_size=20,
         style_table={'overflowX': 'auto'},
     ),
@@ -151,6 +138,16 @@ dcc.Dropdown(
         value='Normalised Total Score',
         inline=True
     ),
+    dcc.RadioItems(
+        id='triple-render-mode-radio',
+        options=[
+            {'label': 'Bars', 'value': 'bar'},
+            {'label': 'WebGL', 'value': 'webgl'},
+            {'label': 'Histogram', 'value': 'aggregated'}
+        ],
+        value='bar',
+        inline=True
+    ),
     dcc.Graph(id='triple-type-visualisation')
 ])
 
@@ -159,118 +156,96 @@ dcc.Dropdown(
      Output('single-type-table', 'columns')],
     Input('generation-dropdown', 'value')
 )
+@metrics.timed()
 def update_single_type_table(gen):
-    mono, _, _ = load_generation_data(gen)
+    mono, _, _ = dataset_store.get(gen)
     columns = [{"name": col, "id": col, "deletable": False, "selectable": True} for col in mono.columns]
     return mono.to_dict('records'), columns
 
+def requested_page(table_id, page_current):
+    """
+    The page a paged table should show: page_current when the table's own
+    pager fired the callback, otherwise the first page, since a new search,
+    sort, page size or generation changes which rows every page holds.
+    """
+    try:
+        triggered = dash.ctx.triggered_prop_ids
+    except MissingCallbackContextException:
+        # Called directly rather than by Dash (e.g. benchmark.py)
+        return page_current
+    return page_current if f"{table_id}.page_current" in triggered else 0
+
+def dual_table_index(mono, dual, triple):
+    return TableIndex(dual, ["First Type", "Second Type"])
+
+def triple_table_index(mono, dual, triple):
+    return TableIndex(triple, ["First Type", "Second Type", "Third Type"])
+
 @app.callback(
     [Output('dual-type-table', 'data'),
-     Output('dual-type-table', 'columns')],
+     Output('dual-type-table', 'columns'),
+     Output('dual-type-table', 'page_count'),
+     Output('dual-type-table', 'page_current')],
     [Input('generation-dropdown', 'value'),
-     Input('dual-type-search', 'value')]
+     Input('dual-type-search', 'value'),
+     Input('dual-type-table', 'page_current'),
+     Input('dual-type-table', 'page_size'),
+     Input('dual-type-table', 'sort_by')]
 )
-def update_dual_type_table(gen, search_query):
-    _, dual, _ = load_generation_data(gen)
-    if search_query:
-        dual = dual[
-            dual['First Type'].str.contains(search_query, case=False, na=False) |
-            dual['Second Type'].str.contains(search_query, case=False, na=False)
-        ]
-    columns = [{"name": col, "id": col, "deletable": False, "selectable": True} for col in dual.columns]
-    return dual.to_dict('records'), columns
+@metrics.timed()
+def update_dual_type_table(gen, search_query, page_current=0, page_size=20, sort_by=None):
+    index = dataset_store.derived(gen, "dual-table", dual_table_index)
+    page_current = requested_page('dual-type-table', page_current)
+    records, page_count, page_current = index.page(search_query, page_current, page_size, sort_by)
+    columns = [{"name": col, "id": col, "deletable": False, "selectable": True} for col in index.columns]
+    return records, columns, page_count, page_current
 
 @app.callback(
     [Output('triple-type-table', 'data'),
-     Output('triple-type-table', 'columns')],
+     Output('triple-type-table', 'columns'),
+     Output('triple-type-table', 'page_count'),
+     Output('triple-type-table', 'page_current')],
     [Input('generation-dropdown', 'value'),
-     Input('triple-type-search', 'value')]
+     Input('triple-type-search', 'value'),
+     Input('triple-type-table', 'page_current'),
+     Input('triple-type-table', 'page_size'),
+     Input('triple-type-table', 'sort_by')]
 )
-def update_triple_type_table(gen, search_query):
-    _, _, triple = load_generation_data(gen)
-    if search_query:
-        triple = triple[
-            triple['First Type'].str.contains(search_query, case=False, na=False) |
-            triple['Second Type'].str.contains(search_query, case=False, na=False) |
-            triple['Third Type'].str.contains(search_query, case=False, na=False)
-        ]
-    columns = [{"name": col, "id": col, "deletable": False, "selectable": True} for col in triple.columns]
-    return triple.to_dict('records'), columns
+@metrics.timed()
+def update_triple_type_table(gen, search_query, page_current=0, page_size=20, sort_by=None):
+    index = dataset_store.derived(gen, "triple-table", triple_table_index)
+    page_current = requested_page('triple-type-table', page_current)
+    records, page_count, page_current = index.page(search_query, page_current, page_size, sort_by)
+    columns = [{"name": col, "id": col, "deletable": False, "selectable": True} for col in index.columns]
+    return records, columns, page_count, page_current
 
 @app.callback(
     Output('single-type-visualisation', 'figure'),
     [Input('generation-dropdown', 'value'),
      Input('score-type-radio', 'value')]
 )
+@metrics.timed()
 def update_single_type_graph(gen, selected_score):
-    mono, _, _ = load_generation_data(gen)
-    if selected_score not in mono.columns:
-        return px.bar(title="Invalid Selection", labels={"First Type": "Type"})
-    mono['Score Type'] = mono[selected_score].apply(lambda x: 'Positive' if x >= 0.5 else 'Negative')
-    return px.bar(
-        mono,
-        x="First Type",
-        y=selected_score,
-        color="Score Type",
-        title=f"Single-Type Rankings – {gen}",
-        labels={"First Type": "Type", selected_score: selected_score}
-    ).update_layout(
-        xaxis={'categoryorder': 'total ascending'},
-        yaxis=dict(range=[0, 1.2]),
-        bargap=0.2
-    )
+    return figure_cache.get("single", gen, selected_score)
 
 @app.callback(
     Output('dual-type-visualisation', 'figure'),
     [Input('generation-dropdown', 'value'),
      Input('dual-score-type-radio', 'value')]
 )
+@metrics.timed()
 def update_dual_type_graph(gen, selected_score):
-    _, dual, _ = load_generation_data(gen)
-    if selected_score not in dual.columns:
-        return px.bar(title="Invalid Selection", labels={"Combined Type": "Type Combination"})
-    dual = dual.dropna(subset=[selected_score, "Combined Type"])
-    if dual.empty:
-        return px.bar(title="No Data Available", labels={"Combined Type": "Type Combination"})
-    dual['Score Type'] = dual[selected_score].apply(lambda x: 'Positive' if x >= 0.5 else 'Negative')
-    return px.bar(
-        dual,
-        x="Combined Type",
-        y=selected_score,
-        color="Score Type",
-        title=f"Dual-Type Rankings – {gen}",
-        labels={"Combined Type": "Type Combination", selected_score: selected_score}
-    ).update_layout(
-        xaxis={'categoryorder': 'total ascending'},
-        yaxis=dict(range=[0, 1.2]),
-        bargap=0.2
-    )
+    return figure_cache.get("dual", gen, selected_score)
 
 @app.callback(
     Output('triple-type-visualisation', 'figure'),
     [Input('generation-dropdown', 'value'),
-     Input('triple-score-type-radio', 'value')]
+     Input('triple-score-type-radio', 'value'),
+     Input('triple-render-mode-radio', 'value')]
 )
-def update_triple_type_graph(gen, selected_score):
-    _, _, triple = load_generation_data(gen)
-    if selected_score not in triple.columns:
-        return px.bar(title="Invalid Selection", labels={"Combined Type": "Type Combination"})
-    triple = triple.dropna(subset=[selected_score, "Combined Type"])
-    if triple.empty:
-        return px.bar(title="No Data Available", labels={"Combined Type": "Type Combination"})
-    triple['Score Type'] = triple[selected_score].apply(lambda x: 'Positive' if x >= 0.5 else 'Negative')
-    return px.bar(
-        triple,
-        x="Combined Type",
-        y=selected_score,
-        color="Score Type",
-        title=f"Triple-Type Rankings – {gen}",
-        labels={"Combined Type": "Type Combination", selected_score: selected_score}
-    ).update_layout(
-        xaxis={'categoryorder': 'total ascending'},
-        yaxis=dict(range=[0, 1.2]),
-        bargap=0.2
-    )
+@metrics.timed()
+def update_triple_type_graph(gen, selected_score, render_mode="bar"):
+    return figure_cache.get("triple", gen, selected_score, render_mode)
 
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 8050))